@@ -12,6 +12,20 @@ This package provides:
 - Utility functions for file operations
 """
 
+from dotenv import load_dotenv
+
+# Load .env once per process, before any module reads the environment
+load_dotenv()
+
 from .main import app
+from .models.problem import GenerateResponse
+
+# Exercise the response validator once so the first request doesn't pay warm-up cost
+GenerateResponse.model_validate({
+    "id": "warmup",
+    "solution_code": "",
+    "results": [{"input": "[]", "expected_output": "null", "passed": True}],
+    "score": 1.0,
+})
 
 __all__ = ['app']
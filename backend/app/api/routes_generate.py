@@ -1,29 +1,30 @@
+from operator import itemgetter
 from fastapi import APIRouter, HTTPException
 from ..models.problem import GenerateRequest, GenerateResponse, TestResult
 from ..core.agent import solve_problem, parse_test_cases
 
 router = APIRouter()
 
+# Runner records always carry every TestResult field; fetch them in one call
+_test_result_fields = itemgetter("input", "expected_output", "output", "passed", "error", "runtime_ms")
+
 @router.post("/generate_solution", response_model=GenerateResponse)
-def generate_solution(req: GenerateRequest):
+async def generate_solution(req: GenerateRequest):
     try:
         testcases = parse_test_cases(req.test_cases)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid test cases format: {str(e)}")
     
     try:
-        record = solve_problem(req.problem, testcases, enable_reflection=False)
+        record = await solve_problem(req.problem, testcases, enable_reflection=False,
+                                     use_cache=req.use_cache)
         
         test_results = [
-            TestResult(
-                input=tc["input"],
-                expected_output=tc["expected_output"],
-                output=tc.get("output"),
-                passed=tc["passed"],
-                error=tc.get("error"),
-                runtime_ms=tc.get("runtime_ms")
+            TestResult.model_construct(
+                input=inp, expected_output=expected, output=output,
+                passed=passed, error=error, runtime_ms=runtime_ms
             )
-            for tc in record["test_cases"]
+            for inp, expected, output, passed, error, runtime_ms in map(_test_result_fields, record["test_cases"])
         ]
         
         return GenerateResponse(
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, Query
 from ..models.problem import RunSummary
-from ..utils.file_ops import list_runs, load_run
+from ..utils.file_ops import list_run_summaries, load_run
 
 router = APIRouter()
 
@@ -29,31 +29,17 @@ def get_runs(limit: int = Query(20, ge=1, le=100), expand: bool = Query(False)):
     - If expand=true: returns full run logs (includes code, test cases, etc.)
     """
     try:
-        files = list_runs()[:limit]
+        # Summaries come from the run index, so no run file is opened here
+        summaries = list_run_summaries(limit)
+        if not expand:
+            # Index entries are written by save_run, so skip re-validating them
+            return [RunSummary.model_construct(**summary) for summary in summaries]
+
+        # Expanded: return full records
         runs = []
-        for fname in files:
-            run_id = fname.replace("run_", "").replace(".json", "")
+        for summary in summaries:
             try:
-                record = load_run(run_id)
-                if not record:
-                    continue
-
-                # Expanded: return full record
-                if expand:
-                    runs.append(record)
-                    continue
-
-                # Summary mode (default)
-                problem_preview = record.get("problem_text", "")[:100]
-                if len(record.get("problem_text", "")) > 100:
-                    problem_preview += "..."
-
-                runs.append(RunSummary(
-                    run_id=run_id,
-                    timestamp=record.get("timestamp", ""),
-                    score=record.get("score", 0.0),
-                    problem_preview=problem_preview
-                ))
+                runs.append(load_run(summary["run_id"]))
             except Exception:
                 continue
         return runs
@@ -1,23 +1,56 @@
 import argparse
+import asyncio
 import json
+import mmap
+import os
 import sys
+import orjson
 from .core.agent import solve_problem, parse_test_cases
+from .core.llm import aclose_shared_http_client
+from .utils.json_io import loads_json
+
+def load_test_cases(args: argparse.Namespace):
+    """Decode test cases from --test-cases-file (memory-mapped) or --test-cases."""
+    if args.test_cases_file is None:
+        return loads_json(args.test_cases)
+    with open(args.test_cases_file, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return loads_json(b"")  # mmap cannot map an empty file; raises JSONDecodeError
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return loads_json(view)
+
+async def solve(args: argparse.Namespace, test_cases):
+    """Solve on this run's event loop, then close the loop's shared HTTP client."""
+    try:
+        return await solve_problem(
+            args.problem,
+            test_cases,
+            enable_reflection=args.reflection,
+            max_retries=args.retries
+        )
+    finally:
+        await aclose_shared_http_client()
 
 def main():
     parser = argparse.ArgumentParser(description="Code-Solver Agent CLI")
     parser.add_argument("--problem", required=True, help="The coding problem description")
-    parser.add_argument("--test-cases", required=True, help="Test cases as JSON array: [[[args], expected], ...]")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--test-cases", help="Test cases as JSON array: [[[args], expected], ...]")
+    source.add_argument("--test-cases-file", help="Path to a JSON file with the test cases array (for large suites)")
     parser.add_argument("--reflection", action="store_true", help="Enable self-reflection loop")
     parser.add_argument("--retries", type=int, default=1, help="Max retries for reflection (default: 1)")
     
     args = parser.parse_args()
     
     try:
-        test_cases_raw = json.loads(args.test_cases)
+        test_cases_raw = load_test_cases(args)
         test_cases = parse_test_cases(test_cases_raw)
     except json.JSONDecodeError as e:
         print(f"Error: Invalid JSON in test cases: {e}", file=sys.stderr)
         sys.exit(1)
+    except OSError as e:
+        print(f"Error: Could not read test cases file: {e}", file=sys.stderr)
+        sys.exit(1)
     except ValueError as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -28,17 +61,14 @@ def main():
     print()
     
     try:
-        record = solve_problem(
-            args.problem, 
-            test_cases, 
-            enable_reflection=args.reflection,
-            max_retries=args.retries
-        )
+        record = asyncio.run(solve(args, test_cases))
         
         print("=" * 80)
         print("RESULT")
         print("=" * 80)
-        print(json.dumps(record, indent=2))
+        sys.stdout.flush()
+        sys.stdout.buffer.write(orjson.dumps(record, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+        sys.stdout.buffer.flush()
         print()
         print(f"Run ID: {record['run_id']}")
         print(f"Score: {record['score']:.2%}")
@@ -1,8 +1,10 @@
+import asyncio
 import json
 import re
 from typing import Any, List, Tuple, Dict, Optional
-from .llm import OpenAILLM
-from .runner import CodeRunner
+from .llm import OpenAILLM, _default_llm
+from .runner import CodeRunner, _default_runner
+from . import solution_cache
 from ..utils.file_ops import save_run
 
 
@@ -19,14 +21,25 @@ class CodeSolverAgent:
         
         Args:
             llm: OpenAILLM instance for code generation
-            runner: CodeRunner instance for code execution
+            runner: CodeRunner instance for code execution (defaults to the
+                process-wide shared runner)
         """
         self.llm = llm or OpenAILLM()
-        self.runner = runner or CodeRunner()
+        self.runner = runner or _default_runner
     
     @staticmethod
     def parse_test_cases(raw: List[List[Any]]) -> List[Tuple[List[Any], Any]]:
         """Parse and validate test cases from raw input."""
+        # Fast path: unpack every pair in one comprehension; any 2-item case whose
+        # inputs are a list is valid (non-list items never unpack to a list input)
+        try:
+            parsed = [(inp, expected) for inp, expected in raw]
+        except (TypeError, ValueError):
+            parsed = None
+        if parsed is not None and all(isinstance(inp, list) for inp, _ in parsed):
+            return parsed
+
+        # Slow path: locate the offending case and report it
         parsed = []
         for item in raw:
             if not isinstance(item, list) or len(item) != 2:
@@ -37,8 +50,9 @@ class CodeSolverAgent:
             parsed.append((inp, expected))
         return parsed
     
-    def solve_problem(self, problem: str, test_cases: List[Tuple[List[Any], Any]], 
-                     enable_reflection: bool = False, max_retries: int = 1) -> Dict[str, Any]:
+    async def solve_problem(self, problem: str, test_cases: List[Tuple[List[Any], Any]],
+                           enable_reflection: bool = False, max_retries: int = 1,
+                           use_cache: bool = True) -> Dict[str, Any]:
         """
         Solve a coding problem with optional self-reflection.
         
@@ -47,39 +61,112 @@ class CodeSolverAgent:
             test_cases: List of (input, expected_output) tuples
             enable_reflection: Whether to enable self-reflection on failures
             max_retries: Maximum number of reflection attempts
+            use_cache: Whether to serve and store single-shot runs from the solution cache
+                (only fully passing runs are stored)
             
         Returns:
             Dictionary with solution results and metadata
         """
+        # Deterministic single-shot runs are served from the persistent cache
+        cache_key = None
+        if use_cache and not enable_reflection:
+            cache_key = solution_cache.make_key(problem, test_cases, self.llm.model, self.llm.temperature,
+                                                self.llm.max_tokens, self.llm.prompt_hash())
+            # File I/O, so keep it off the event loop
+            cached = await asyncio.to_thread(solution_cache.get, cache_key)
+            if cached:
+                return cached
+
         examples = [{"inputs": tc[0], "expected": tc[1]} for tc in test_cases[:3]]
 
         # Generate initial code
-        code = self.llm.generate_code(problem, examples)
-        record = self.runner.run_tests(problem, code, test_cases, llm_trajectory=[{"generated": code}])
-
-        # Self-reflection loop
-        retries = 0
-        while enable_reflection and retries < max_retries and record["score"] < 1.0 and not record.get("error"):
-            failures = [r for r in record["test_cases"] if not r["passed"]]
-            feedback = {
-                "instruction": "The previous solution failed these cases. Fix the logic and return corrected code only.",
-                "failing": failures[:3],
-            }
-            revised_prompt = problem + "\n\nNotes from tests:\n" + json.dumps(feedback)
-            revised_code = self.llm.generate_code(revised_prompt, examples)
-            record = self.runner.run_tests(
-                problem, revised_code, test_cases, 
-                llm_trajectory=record.get("llm_trajectory", []) + [{"revised": revised_code}]
-            )
-            retries += 1
+        code = await self.llm.generate_code(problem, examples)
+        record = await self.runner.run_tests_async(
+            problem, code, test_cases, llm_trajectory=[{"generated": code}]
+        )
+
+        # Self-reflection: revise candidates concurrently instead of one retry at a time
+        if enable_reflection and max_retries > 0 and record["score"] < 1.0 and not record.get("error"):
+            record = await self._reflect(problem, test_cases, examples, record, max_retries)
 
         # Save results
         save_run(record)
+        # Failing, blocked or timed-out runs are never cached, so the next request tries again
+        if cache_key is not None and record["score"] == 1.0 and not record.get("error"):
+            await asyncio.to_thread(solution_cache.set, cache_key, record)
         return record
-    
-    def solve_with_custom_llm(self, problem: str, test_cases: List[Tuple[List[Any], Any]], 
-                             custom_llm: OpenAILLM, enable_reflection: bool = False, 
-                             max_retries: int = 1) -> Dict[str, Any]:
+
+    async def _reflect(self, problem: str, test_cases: List[Tuple[List[Any], Any]],
+                       examples: List[Dict[str, Any]], record: Dict[str, Any],
+                       max_retries: int) -> Dict[str, Any]:
+        """
+        Speculatively generate `max_retries` revisions in parallel.
+
+        Each candidate gets the same test feedback but a different temperature.
+        The first candidate to pass every test wins and the rest are cancelled;
+        otherwise the best-scoring record (initial attempt included) is returned.
+
+        Args:
+            problem: Description of the coding problem
+            test_cases: List of (input, expected_output) tuples
+            examples: Example test cases included in the prompt
+            record: Result of the initial attempt
+            max_retries: Number of revision candidates to launch
+
+        Returns:
+            Dictionary with the selected solution results
+        """
+        failures = [r for r in record["test_cases"] if not r["passed"]]
+        feedback = {
+            "instruction": "The previous solution failed these cases. Fix the logic and return corrected code only.",
+            "failing": failures[:3],
+        }
+        revised_prompt = problem + "\n\nNotes from tests:\n" + json.dumps(feedback)
+        trajectory = record.get("llm_trajectory", [])
+
+        async def attempt(temperature: float) -> Dict[str, Any]:
+            revised_code = await self.llm.generate_code(revised_prompt, examples, temperature=temperature)
+            return await self.runner.run_tests_async(
+                problem, revised_code, test_cases,
+                llm_trajectory=trajectory + [{"revised": revised_code, "temperature": temperature}]
+            )
+
+        tasks = [asyncio.ensure_future(attempt(t)) for t in self._reflection_temperatures(max_retries)]
+        best, completed, first_error = record, 0, None
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    candidate = await next_done
+                except Exception as e:
+                    first_error = first_error or e
+                    continue
+                completed += 1
+                if candidate["score"] > best["score"]:
+                    best = candidate
+                if best["score"] >= 1.0:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Let the losers finish cancelling (killing their test subprocesses) and
+            # retrieve their exceptions
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if not completed and first_error is not None:
+            raise first_error
+        return best
+
+    def _reflection_temperatures(self, k: int) -> List[float]:
+        """Spread `k` candidate temperatures from the LLM's base temperature up to 0.7."""
+        base = self.llm.temperature
+        if k <= 1:
+            return [base]
+        top = max(base, 0.7)
+        return [round(base + (top - base) * i / (k - 1), 2) for i in range(k)]
+
+    async def solve_with_custom_llm(self, problem: str, test_cases: List[Tuple[List[Any], Any]],
+                                   custom_llm: OpenAILLM, enable_reflection: bool = False,
+                                   max_retries: int = 1) -> Dict[str, Any]:
         """
         Solve a problem with a custom LLM instance.
         
@@ -98,7 +185,7 @@ class CodeSolverAgent:
         self.llm = custom_llm
         
         try:
-            result = self.solve_problem(problem, test_cases, enable_reflection, max_retries)
+            result = await self.solve_problem(problem, test_cases, enable_reflection, max_retries)
         finally:
             # Restore original LLM
             self.llm = original_llm
@@ -106,14 +193,19 @@ class CodeSolverAgent:
         return result
 
 
+# Shared default agent, built once per process and reused by solve_problem() below
+_default_agent = CodeSolverAgent(llm=_default_llm)
+
+
 # Backward compatibility functions
 def parse_test_cases(raw: List[List[Any]]) -> List[Tuple[List[Any], Any]]:
     """Backward compatibility function."""
     return CodeSolverAgent.parse_test_cases(raw)
 
 
-def solve_problem(problem: str, test_cases: List[Tuple[List[Any], Any]], 
-                 enable_reflection: bool = False, max_retries: int = 1) -> Dict[str, Any]:
+async def solve_problem(problem: str, test_cases: List[Tuple[List[Any], Any]],
+                        enable_reflection: bool = False, max_retries: int = 1,
+                        use_cache: bool = True) -> Dict[str, Any]:
     """Backward compatibility function."""
-    agent = CodeSolverAgent()
-    return agent.solve_problem(problem, test_cases, enable_reflection, max_retries)
+    return await _default_agent.solve_problem(problem, test_cases, enable_reflection, max_retries,
+                                              use_cache)
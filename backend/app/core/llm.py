@@ -1,7 +1,41 @@
+import asyncio
+import hashlib
 import os
+import re
+import weakref
 from typing import List, Dict, Any, Optional
-from dotenv import load_dotenv
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI
+
+# First fenced block (optional python tag); an unterminated fence runs to end of text
+_CODE_RE = re.compile(r"```[ \t]*(?:python3?|py)?[ \t]*\n?(.*?)(?:```|\Z)", re.DOTALL | re.IGNORECASE)
+
+# Pooled HTTP/2 transports shared by every OpenAILLM, one per event loop: connections
+# are bound to the loop that opened them (uvicorn's loop, or each asyncio.run in CLI/eval)
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def shared_http_client() -> httpx.AsyncClient:
+    """Return the shared keep-alive HTTP/2 client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+            timeout=60.0,
+        )
+        _http_clients[loop] = client
+    return client
+
+
+async def aclose_shared_http_client() -> None:
+    """Close the running loop's shared HTTP client (call on app shutdown)."""
+    client = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
 
 
 class OpenAILLM:
@@ -24,6 +58,17 @@ class OpenAILLM:
         "Do not include explanations, markdown, or text—return pure Python code."
     )
     
+    # Static part of the user prompt, shared by every request
+    _USER_GUIDELINES = (
+        "Guidelines:\n"
+        "- Write a function named `solve` whose parameters exactly match the inputs of each test case.\n"
+        "- For test case input like [\"hello\"], treat the argument as a single string, not a list of strings.\n"
+        "- Do NOT index into parameters unless the problem explicitly requires it.\n"
+        "- Return the result directly (no prints).\n"
+        "- The runner will call your function as solve(*args).\n"
+        "- Use only Python stdlib and avoid any external dependencies.\n"
+    )
+    
     def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o-mini", 
                  prompt_template_path: Optional[str] = None, temperature: float = 0.0, 
                  max_tokens: int = 1200):
@@ -37,8 +82,6 @@ class OpenAILLM:
             temperature: Model temperature
             max_tokens: Maximum tokens to generate
         """
-        load_dotenv()
-        
         self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
         self.model = model
         self.temperature = temperature
@@ -53,59 +96,69 @@ class OpenAILLM:
                 os.path.dirname(__file__), "..", "..", "prompt_template.txt"
             )
         
-        # Initialize OpenAI client
-        self.client = OpenAI(api_key=self.api_key)
+        # System prompt, read from the template on first use
+        self._system_prompt_cache: Optional[str] = None
+        
+        # Async OpenAI client, created on first use over the shared HTTP transport
+        self._client: Optional[AsyncOpenAI] = None
+        self._client_transport: Optional[httpx.AsyncClient] = None
+    
+    @property
+    def client(self) -> AsyncOpenAI:
+        """AsyncOpenAI client bound to the running loop's shared HTTP/2 connection pool."""
+        transport = shared_http_client()
+        if self._client is None or self._client_transport is not transport:
+            self._client = AsyncOpenAI(api_key=self.api_key, http_client=transport)
+            self._client_transport = transport
+        return self._client
     
     def _load_system_prompt(self) -> str:
-        """Load system prompt from template file or use default."""
-        if os.path.exists(self.prompt_template_path):
-            with open(self.prompt_template_path, "r", encoding="utf-8") as f:
-                prompt = f.read().strip()
-            print(f"[LLM] Using system prompt from: {self.prompt_template_path}")
-            return prompt
-        print("[LLM] Using built-in default system prompt.")
-        return self.DEFAULT_SYSTEM
+        """Load system prompt from template file or use default (cached after first load)."""
+        if self._system_prompt_cache is None:
+            try:
+                with open(self.prompt_template_path, "r", encoding="utf-8") as f:
+                    self._system_prompt_cache = f.read().strip()
+            except OSError:
+                self._system_prompt_cache = self.DEFAULT_SYSTEM
+        return self._system_prompt_cache
+    
+    def prompt_hash(self) -> str:
+        """SHA-256 of the system prompt and user guidelines, for solution cache keys."""
+        prompt = self._load_system_prompt() + "\0" + self._USER_GUIDELINES
+        return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
     
     def build_messages(self, problem_text: str, examples: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, str]]:
         """Build messages for OpenAI chat model."""
         system = self._load_system_prompt()
-        user = f"""Problem:
-{problem_text}
-
-Guidelines:
-- Write a function named `solve` whose parameters exactly match the inputs of each test case.
-- For test case input like ["hello"], treat the argument as a single string, not a list of strings.
-- Do NOT index into parameters unless the problem explicitly requires it.
-- Return the result directly (no prints).
-- The runner will call your function as solve(*args).
-- Use only Python stdlib and avoid any external dependencies.
-"""
+        user = f"Problem:\n{problem_text}\n\n{self._USER_GUIDELINES}"
         if examples:
-            user += "\nTest Cases (examples):\n"
-            for ex in examples[:5]:
-                user += f"- inputs={ex['inputs']}, expected={ex['expected']}\n"
+            user += "\nTest Cases (examples):\n" + "".join(
+                f"- inputs={ex['inputs']}, expected={ex['expected']}\n" for ex in examples[:5]
+            )
 
         return [
             {"role": "system", "content": system},
             {"role": "user", "content": user}
         ]
     
-    def generate_code(self, problem_text: str, examples: Optional[List[Dict[str, Any]]] = None) -> str:
+    async def generate_code(self, problem_text: str, examples: Optional[List[Dict[str, Any]]] = None,
+                            temperature: Optional[float] = None) -> str:
         """
         Generate Python code for the given problem.
         
         Args:
             problem_text: Description of the coding problem
             examples: List of example test cases
+            temperature: Per-call temperature override (defaults to self.temperature)
             
         Returns:
             Generated Python code
         """
         messages = self.build_messages(problem_text, examples)
-        response = self.client.chat.completions.create(
+        response = await self.client.chat.completions.create(
             model=self.model,
             messages=messages,
-            temperature=self.temperature,
+            temperature=self.temperature if temperature is None else temperature,
             max_tokens=self.max_tokens,
         )
         content = response.choices[0].message.content
@@ -113,26 +166,20 @@ Guidelines:
     
     def _extract_code(self, text: str) -> str:
         """Extract Python code from LLM output."""
-        t = text.strip()
-        if "```" in t:
-            parts = t.split("```")
-            for i, p in enumerate(parts):
-                if i % 2 == 1:  # inside a code block
-                    lines = p.strip().split("\n")
-                    if lines and lines[0].strip().lower().startswith("python"):
-                        return "\n".join(lines[1:]).strip()
-                    return p.strip()
-        return t
+        m = _CODE_RE.search(text)
+        return m.group(1).strip() if m else text.strip()
+
+
+# Shared default client, built once per process and reused by the helpers below
+_default_llm = OpenAILLM()
 
 
 # Backward compatibility functions
-def call_llm(problem_text: str, examples: Optional[List[Dict[str, Any]]] = None) -> str:
+async def call_llm(problem_text: str, examples: Optional[List[Dict[str, Any]]] = None) -> str:
     """Backward compatibility function."""
-    llm = OpenAILLM()
-    return llm.generate_code(problem_text, examples)
+    return await _default_llm.generate_code(problem_text, examples)
 
 
 def build_messages(problem_text: str, examples: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, str]]:
     """Backward compatibility function."""
-    llm = OpenAILLM()
-    return llm.build_messages(problem_text, examples)
+    return _default_llm.build_messages(problem_text, examples)
@@ -1,11 +1,523 @@
+import ast
+import asyncio
+import atexit
+import hashlib
+import importlib
+import inspect
 import json
+import multiprocessing
+import multiprocessing.util
 import os
+import pickle
+import queue
+import shutil
+import signal
 import subprocess
+import sys
 import tempfile
+import threading
 import time
-from typing import Any, Dict, List, Tuple, Set, Optional
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Tuple, Set, Optional
 from datetime import datetime
 
+import orjson
+
+from ..utils.json_io import loads_json
+
+
+# Result of one test case: (output, error, runtime_ms); error is None on success
+_Outcome = Tuple[Any, Optional[str], int]
+
+
+# -------------------------------------------------------------------------
+# SERIALIZATION
+# -------------------------------------------------------------------------
+# Decoding (with the big-int and NaN fallbacks to json) lives in utils.json_io
+_loads = loads_json
+
+
+def _dumps(obj: Any, sort_keys: bool = False) -> str:
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+    try:
+        return orjson.dumps(obj, option=option).decode("utf-8")
+    except TypeError:
+        # Integers beyond 64 bits and other values only json can encode
+        return json.dumps(obj, sort_keys=sort_keys)
+
+
+def _digest(value: Any) -> Optional[bytes]:
+    """
+    16-byte blake2b digest of a result's sorted-key JSON encoding, or None if
+    it can't be encoded. Equal digests mean equal JSON, whatever the key order
+    or sequence type.
+    """
+    try:
+        encoded = orjson.dumps(value, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    except TypeError:
+        try:
+            encoded = json.dumps(value, sort_keys=True).encode("utf-8")
+        except (TypeError, ValueError):
+            return None
+    return hashlib.blake2b(encoded, digest_size=16).digest()
+
+
+# Expected-output digests per test-case list, so a suite that is re-run against
+# many solutions (reflection candidates, evaluation) is hashed once. Keyed by
+# id(); the entry holds the list itself, so the id can't be reused
+_EXPECTED_CACHE_MAX = 64
+_expected_cache: "OrderedDict[int, Tuple[List[Tuple[List[Any], Any]], List[Optional[bytes]]]]" = OrderedDict()
+_expected_cache_lock = threading.Lock()
+
+
+def _expected_digests(test_cases: List[Tuple[List[Any], Any]]) -> List[Optional[bytes]]:
+    key = id(test_cases)
+    with _expected_cache_lock:
+        hit = _expected_cache.get(key)
+        if hit is not None and hit[0] is test_cases and len(hit[1]) == len(test_cases):
+            _expected_cache.move_to_end(key)
+            return hit[1]
+
+    digests = [_digest(expected) for _, expected in test_cases]
+
+    with _expected_cache_lock:
+        _expected_cache[key] = (test_cases, digests)
+        _expected_cache.move_to_end(key)
+        while len(_expected_cache) > _EXPECTED_CACHE_MAX:
+            _expected_cache.popitem(last=False)
+    return digests
+
+
+# -------------------------------------------------------------------------
+# SOLUTION FILES
+# -------------------------------------------------------------------------
+# Wrapper scripts live in one per-process directory, on RAM-backed /dev/shm
+# where available, and are removed when the process exits
+_SHM_DIR = "/dev/shm"
+_solutions_dir: Optional[str] = None
+_solutions_dir_lock = threading.Lock()
+
+
+def _get_solutions_dir() -> str:
+    global _solutions_dir
+    with _solutions_dir_lock:
+        if _solutions_dir is None or not os.path.isdir(_solutions_dir):
+            parent = _SHM_DIR if os.path.isdir(_SHM_DIR) and os.access(_SHM_DIR, os.W_OK) else None
+            _solutions_dir = tempfile.mkdtemp(prefix="code_solver_", dir=parent)
+            atexit.register(shutil.rmtree, _solutions_dir, True)
+        return _solutions_dir
+
+
+# -------------------------------------------------------------------------
+# PERSISTENT WORKER POOL
+# -------------------------------------------------------------------------
+# Worker side: each pool process keeps the compiled code of solutions it has
+# already seen, keyed by code hash, so a solution is compiled once per worker
+# no matter how many cases it answers. The code itself only ever runs in a
+# forked per-case child, never in the worker.
+_worker_code: "OrderedDict[str, Any]" = OrderedDict()
+_WORKER_CODE_MAX = 64
+_fork_context = multiprocessing.get_context("fork")
+
+
+def _new_run_id() -> str:
+    """
+    Millisecond timestamp plus a random suffix: ids still sort by creation
+    time, but runs finishing in the same millisecond (concurrent eval
+    problems, or another process) never share one.
+    """
+    return f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+
+
+def _code_hash(code: str) -> str:
+    return hashlib.blake2b(code.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class _CaseTimeout(BaseException):
+    pass
+
+
+def _raise_case_timeout(signum, frame):
+    raise _CaseTimeout()
+
+
+# (required positional params, max positional params or None for *args),
+# or None when the signature can't be inspected
+_Arity = Optional[Tuple[int, Optional[int]]]
+
+
+def _solve_arity(fn) -> _Arity:
+    try:
+        params = inspect.signature(fn).parameters.values()
+    except (TypeError, ValueError):
+        return None
+    positional = [p for p in params if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)]
+    required = sum(1 for p in positional if p.default is p.empty)
+    variadic = any(p.kind == p.VAR_POSITIONAL for p in params)
+    return required, None if variadic else len(positional)
+
+
+def _call_solve(fn, arity: _Arity, fargs):
+    """
+    Call solve with the argument shape its signature accepts, decided up front.
+
+    Tries, in order: solve(*args), solve(args), and for a single list argument
+    solve(*args[0]). Unlike retrying on TypeError, an error raised inside
+    solve is never mistaken for a signature mismatch.
+    """
+    if arity is None:
+        return fn(*fargs)
+    required, maximum = arity
+
+    def fits(n: int) -> bool:
+        return n >= required and (maximum is None or n <= maximum)
+
+    if fits(len(fargs)):
+        return fn(*fargs)
+    if fits(1):
+        return fn(fargs)
+    if len(fargs) == 1 and isinstance(fargs[0], (list, tuple)) and fits(len(fargs[0])):
+        return fn(*fargs[0])
+    raise RuntimeError("Could not match function signature")
+
+
+def _compiled(code_hash: str, code: str) -> Any:
+    compiled = _worker_code.get(code_hash)
+    if compiled is None:
+        compiled = _worker_code[code_hash] = compile(code, "<solution>", "exec")
+        if len(_worker_code) > _WORKER_CODE_MAX:
+            _worker_code.popitem(last=False)
+    else:
+        _worker_code.move_to_end(code_hash)
+    return compiled
+
+
+def _case_child(compiled, fargs, timeout: int, conn) -> None:
+    """
+    Forked child: run the solution's top-level code, call solve once and send
+    back a pickled (output, error) pair.
+
+    Loading and the call are each bounded by `timeout`. Whatever the solution
+    does at module level (patching json, growing globals) dies with the child.
+    """
+    # Solution prints must not land in the server's stdout
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+    signal.signal(signal.SIGALRM, _raise_case_timeout)
+    try:
+        namespace = {"__name__": "__solution__"}
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+        exec(compiled, namespace)
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        fn = namespace.get("solve")
+        if fn is None:
+            raise RuntimeError("No 'solve' function found in generated code")
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+        result = (_call_solve(fn, _solve_arity(fn), fargs), None)
+        signal.setitimer(signal.ITIMER_REAL, 0)
+    except _CaseTimeout:
+        result = (None, f"Timeout after {timeout}s")
+    except BaseException as e:
+        result = (None, str(e))
+    try:
+        frame = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        frame = pickle.dumps((None, str(e)), protocol=pickle.HIGHEST_PROTOCOL)
+    # send_bytes is length-prefixed, so the parent reads exactly one frame
+    conn.send_bytes(frame)
+    conn.close()
+
+
+def _run_case(code_hash: str, code: str, inp: Any, timeout: int) -> _Outcome:
+    """Worker entrypoint: run one test case and return its (output, error, runtime_ms)."""
+    start = time.time()
+    try:
+        compiled = _compiled(code_hash, code)
+    except Exception as e:
+        return None, str(e), 0
+
+    # Fork per case: the child inherits the preloaded modules copy-on-write, a hung
+    # or crashing case is killed without losing the warm worker, and nothing the
+    # solution does (at module level or in solve) outlives its case
+    fargs = inp if isinstance(inp, (list, tuple)) else [inp]
+    recv_conn, send_conn = _fork_context.Pipe(duplex=False)
+    child = _fork_context.Process(target=_case_child, args=(compiled, fargs, timeout, send_conn),
+                                  daemon=True)
+    child.start()
+    send_conn.close()
+    try:
+        # The child times itself out; this only catches code that blocks SIGALRM
+        if not recv_conn.poll(2 * timeout + 1):
+            child.kill()
+            return None, f"Timeout after {timeout}s", timeout * 1000
+        try:
+            output, error = pickle.loads(recv_conn.recv_bytes())
+        except EOFError:
+            child.join()
+            return None, f"Solution process exited with code {child.exitcode}", int((time.time() - start) * 1000)
+    finally:
+        recv_conn.close()
+        child.join()
+    runtime_ms = int((time.time() - start) * 1000)
+    if error is not None and error.startswith("Timeout after"):
+        runtime_ms = timeout * 1000
+    return output, error, runtime_ms
+
+
+def _preload_modules(names: Tuple[str, ...]) -> None:
+    """Worker start-up: import the modules solutions commonly use, once per worker."""
+    for name in names:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+
+def _worker_main(conn, preload: Tuple[str, ...]) -> None:
+    """
+    Pool worker loop: run (code_hash, code, input, timeout) tasks until told to stop.
+
+    The worker leads its own process group, so killing the group also takes
+    down a per-case child it has forked.
+    """
+    os.setsid()
+    _preload_modules(preload)
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+        conn.send(_run_case(*task))
+
+
+class _Worker:
+    """One pool worker process and the parent's end of its task pipe."""
+
+    def __init__(self, context, preload: Tuple[str, ...], generation: int):
+        self.conn, child_conn = context.Pipe()
+        # Not a daemon: daemonic processes can't fork the per-case children.
+        # The pool shuts its workers down at exit instead
+        self.process = context.Process(target=_worker_main, args=(child_conn, preload))
+        self.process.start()
+        child_conn.close()
+        self.generation = generation
+
+    def kill(self) -> None:
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        # Also covers a worker killed before its setsid()
+        self.process.kill()
+        self.conn.close()
+        self.process.join(timeout=1)
+
+
+class _WorkerPool:
+    """
+    Pre-warmed Python worker processes that answer many test cases each.
+
+    Replaces one interpreter start-up per test case with a pipe round trip:
+    each worker compiles a solution once and forks a short-lived child per
+    case that runs it, so no solution code ever executes in the worker
+    itself. Cases wait for an idle worker without that time counting against
+    them; a worker that still misses its own case's deadline is killed and
+    replaced on its own, leaving every other run's cases alone.
+
+    Workers come from a forkserver, never forked from the (threaded) server.
+    """
+
+    # Slack on top of a case's load + run timeouts before its worker is killed
+    HARD_TIMEOUT_GRACE = 2.0
+
+    def __init__(self, max_workers: Optional[int] = None, preload: Iterable[str] = ()):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # Imported by every worker at start-up, so the per-case children inherit them
+        self.preload = tuple(sorted(preload))
+        self._context = multiprocessing.get_context("forkserver")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: Set[_Worker] = set()
+        # Bumped by shutdown(); workers of an older generation are retired, not reused
+        self._generation = 0
+        self._started = False
+        self._lock = threading.Lock()
+        # Exit finalizers with a priority run before multiprocessing joins its
+        # (non-daemon) children, which would otherwise wait on idle workers forever
+        multiprocessing.util.Finalize(self, self.shutdown, exitpriority=10)
+
+    def _spawn(self, generation: int) -> None:
+        worker = _Worker(self._context, self.preload, generation)
+        with self._lock:
+            if generation != self._generation:
+                stale = True
+            else:
+                stale = False
+                self._workers.add(worker)
+        if stale:
+            worker.kill()
+        else:
+            self._idle.put(worker)
+
+    def _retire(self, worker: _Worker) -> None:
+        with self._lock:
+            self._workers.discard(worker)
+        worker.kill()
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            generation = self._generation
+        for _ in range(self.max_workers):
+            self._spawn(generation)
+
+    def _run_one(self, code_hash: str, code: str, inp: Any, timeout: int) -> _Outcome:
+        """Run one case on the next idle worker; its deadline starts when the worker takes it."""
+        while True:
+            try:
+                worker = self._idle.get(timeout=1.0)
+                break
+            except queue.Empty:
+                # Restart the pool if it was shut down while this run waited
+                self._ensure_started()
+        try:
+            worker.conn.send((code_hash, code, inp, timeout))
+            # Loading the solution and running the case are each bounded by `timeout` in the child
+            if worker.conn.poll(2 * timeout + self.HARD_TIMEOUT_GRACE):
+                outcome = worker.conn.recv()
+                healthy = True
+            else:
+                outcome, healthy = (None, f"Timeout after {timeout}s", timeout * 1000), False
+        except (EOFError, OSError) as e:
+            outcome, healthy = (None, f"Worker failed: {e}", 0), False
+
+        if healthy and worker.generation == self._generation:
+            self._idle.put(worker)
+        else:
+            self._retire(worker)
+            if worker.generation == self._generation:
+                self._spawn(worker.generation)
+        return outcome
+
+    def run(self, code: str, inputs: List[Any], timeout: int
+            ) -> List[_Outcome]:
+        """Run every test input against `code` in parallel; results are in input order."""
+        self._ensure_started()
+        code_hash = _code_hash(code)
+        if len(inputs) <= 1:
+            return [self._run_one(code_hash, code, inp, timeout) for inp in inputs]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(inputs))) as executor:
+            return list(executor.map(lambda inp: self._run_one(code_hash, code, inp, timeout), inputs))
+
+    def warm_up(self) -> None:
+        """Start every worker process now rather than on the first test run."""
+        self._ensure_started()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._started = False
+            workers, self._workers = self._workers, set()
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        for worker in workers:
+            worker.kill()
+
+
+_shared_pool: Optional[_WorkerPool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def shared_worker_pool() -> _WorkerPool:
+    """Return the process-wide worker pool, creating it on first use."""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = _WorkerPool(preload=CodeRunner.DEFAULT_ALLOWED_IMPORTS)
+        return _shared_pool
+
+
+class _SafetyVisitor(ast.NodeVisitor):
+    """
+    Walks a solution's AST and raises RuntimeError on the first unsafe node.
+
+    Checks real imports, names and attribute accesses, so text inside strings
+    and comments is ignored and aliasing (`f = getattr`) is still caught.
+    Private (`_`-prefixed) members of imported modules are off limits too,
+    since they hold other modules (`random._os`), and so are blocked builtins
+    reached as attributes (`len.__self__.__import__`) and frame walks.
+    """
+
+    def __init__(self, runner: "CodeRunner"):
+        self.runner = runner
+        # Names bound to modules by import statements
+        self.module_names: Set[str] = set()
+
+    def _check_module(self, module: str) -> None:
+        root = module.split(".")[0]
+        if root not in self.runner.allowed_imports and root != "solve":
+            raise RuntimeError(
+                f"Import '{root}' not allowed. Only standard library modules are permitted."
+            )
+
+    def visit_Module(self, node: ast.Module) -> None:
+        # Collect every import first, so a use above the import is still caught
+        for child in ast.walk(node):
+            if isinstance(child, ast.Import):
+                self.module_names.update(a.asname or a.name.split(".")[0] for a in child.names)
+            elif isinstance(child, ast.ImportFrom):
+                # `from collections import abc` binds a module as well
+                self.module_names.update(a.asname or a.name for a in child.names)
+        self.generic_visit(node)
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            self._check_module(alias.name)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        if node.level:
+            raise RuntimeError("Relative imports are not allowed.")
+        self._check_module(node.module or "")
+        for alias in node.names:
+            if alias.name.startswith("_"):
+                raise RuntimeError(f"Blocked potentially unsafe code pattern: import {alias.name}")
+
+    def visit_Name(self, node: ast.Name) -> None:
+        # Module dunders (__loader__, __spec__, ...) lead back to the import system
+        if node.id in self.runner.blocked_names or (
+                node.id.startswith("__") and node.id.endswith("__") and node.id != "__name__"):
+            raise RuntimeError(f"Blocked potentially unsafe code pattern: {node.id}")
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        attr = node.attr
+        if attr in self.runner.blocked_attributes:
+            raise RuntimeError(f"Blocked potentially unsafe code pattern: .{attr}")
+        if self._is_module(node.value):
+            # Private module members hold other modules (`random._os`)
+            blocked = attr.startswith("_")
+        else:
+            # A blocked builtin reached through an object (`x.__import__`, `b.open`);
+            # allowed modules' own functions (`re.compile`) are fine
+            blocked = attr in self.runner.blocked_names
+        if blocked:
+            raise RuntimeError(f"Blocked potentially unsafe code pattern: .{attr}")
+        self.generic_visit(node)
+
+    def _is_module(self, node: ast.expr) -> bool:
+        """Whether `node` names an imported module (`os` or `os.path` style)."""
+        while isinstance(node, ast.Attribute):
+            node = node.value
+        return isinstance(node, ast.Name) and node.id in self.module_names
+
 
 class CodeRunner:
     """
@@ -20,132 +532,359 @@ class CodeRunner:
         "json", "copy", "typing"
     }
 
-    DEFAULT_DANGEROUS_PATTERNS = [
-        "import os", "from os", "import sys", "from sys",
-        "import subprocess", "from subprocess",
-        "import socket", "from socket",
-        "import shutil", "from shutil",
-        "eval(", "exec(", "compile(", "__import__",
-        "open(", "file(", "input(", "raw_input(",
-        "globals(", "locals(", "vars(",
+    # Builtins that give access to the interpreter, filesystem or introspection
+    DEFAULT_BLOCKED_NAMES = {
+        "eval", "exec", "compile", "__import__", "__builtins__",
+        "open", "file", "input", "raw_input",
+        "globals", "locals", "vars",
         "getattr", "setattr", "delattr",
-        "breakpoint(", "help(", "dir("
-    ]
+        "breakpoint", "help", "dir"
+    }
+
+    # Attributes used to climb from any object back to builtins / other modules
+    DEFAULT_BLOCKED_ATTRIBUTES = {
+        "__subclasses__", "__globals__", "__builtins__", "__code__", "__bases__", "__mro__",
+        "__base__", "__class__", "__dict__", "__init__", "__getattribute__", "__self__",
+        # Frame and traceback walks reach the globals of other modules
+        "f_globals", "f_locals", "f_back", "f_builtins", "tb_frame",
+        "gi_frame", "cr_frame", "ag_frame"
+    }
+
+    SOLUTION_CACHE_MAX = 256
 
     def __init__(self, allowed_imports: Optional[Set[str]] = None,
-                 dangerous_patterns: Optional[List[str]] = None,
+                 blocked_names: Optional[Set[str]] = None,
                  default_timeout: int = 6,
-                 runs_dir: Optional[str] = None):
-        """Initialize CodeRunner with safety and execution settings."""
+                 runs_dir: Optional[str] = None,
+                 use_worker_pool: Optional[bool] = None):
+        """
+        Initialize CodeRunner with safety and execution settings.
+
+        `use_worker_pool` runs tests on the shared persistent worker pool instead
+        of one fresh interpreter per test case; it defaults to the
+        CODE_RUNNER_WORKER_POOL=1 environment setting.
+        """
         self.allowed_imports = allowed_imports or self.DEFAULT_ALLOWED_IMPORTS
-        self.dangerous_patterns = dangerous_patterns or self.DEFAULT_DANGEROUS_PATTERNS
+        self.blocked_names = blocked_names or self.DEFAULT_BLOCKED_NAMES
+        self.blocked_attributes = self.DEFAULT_BLOCKED_ATTRIBUTES
         self.default_timeout = default_timeout
+        if use_worker_pool is None:
+            use_worker_pool = os.getenv("CODE_RUNNER_WORKER_POOL") == "1"
+        self._pool = shared_worker_pool() if use_worker_pool else None
+
+        # Code hash -> wrapper file path / set of hashes that passed validation,
+        # so re-running the same solution skips validation and the file write.
+        # Evicted wrapper files are deleted, bounding what sits in tmpfs
+        self._solution_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._solution_cache_lock = threading.Lock()
+        self._validated: Set[str] = set()
 
         # Directory for run logs
         self.runs_dir = runs_dir or os.path.join(os.path.dirname(__file__), "..", "runs")
         os.makedirs(self.runs_dir, exist_ok=True)
 
+    def start(self) -> None:
+        """Warm up the worker pool, if this runner uses one; a no-op otherwise."""
+        if self._pool is not None:
+            self._pool.warm_up()
+
+    def close(self) -> None:
+        """Shut down the worker pool, if this runner uses one."""
+        if self._pool is not None:
+            self._pool.shutdown()
+
     # -------------------------------------------------------------------------
     # SAFETY CHECKS
     # -------------------------------------------------------------------------
     def _validate_code_safety(self, code: str) -> None:
-        """Block unsafe imports and patterns."""
-        code_lower = code.lower()
-        for pattern in self.dangerous_patterns:
-            if pattern.lower() in code_lower:
-                raise RuntimeError(f"Blocked potentially unsafe code pattern: {pattern}")
-
-        for line in code.split("\n"):
-            stripped = line.strip()
-            if stripped.startswith("import ") or stripped.startswith("from "):
-                parts = stripped.split()
-                if len(parts) >= 2:
-                    module = parts[1] if stripped.startswith("from") else parts[1].split(".")[0]
-                    if module not in self.allowed_imports and module != "solve":
-                        raise RuntimeError(
-                            f"Import '{module}' not allowed. Only standard library modules are permitted."
-                        )
+        """Block unsafe imports, builtins and attribute access (one AST walk)."""
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            # Nothing can run; execution reports the syntax error per test case
+            return
+        _SafetyVisitor(self).visit(tree)
 
     # -------------------------------------------------------------------------
     # FILE CREATION
     # -------------------------------------------------------------------------
     def _make_solution_file(self, generated_code: str) -> str:
         """Write generated code to an isolated temporary file with safe wrapper."""
+        key = _code_hash(generated_code)
+        with self._solution_cache_lock:
+            path = self._solution_cache.get(key)
+            if path is not None and os.path.exists(path):
+                self._solution_cache.move_to_end(key)
+                return path
         self._validate_code_safety(generated_code)
 
         # Escape braces to avoid f-string parsing
         wrapper = f"""
-import json
-import sys
-
 {generated_code}
 
-if __name__ == "__main__":
-    import argparse
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--input", required=True)
-    args = parser.parse_args()
 
+def _run_harness():
+    # Harness modules are imported here, not at module level, so they are never
+    # globals the solution can reach (e.g. sys.modules)
+    import json
+    import sys
+    import inspect
+    import re
+    import signal
+    import time
     try:
-        payload = json.loads(args.input)
+        import orjson
+    except ImportError:
+        orjson = None
+
+    def _dumps(obj):
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+            except TypeError:
+                pass
+        return json.dumps(obj)
+
+    def _loads(text):
+        # orjson would read integers beyond 64 bits as floats
+        if orjson is None or re.search(r"\\d{{19}}", text):
+            return json.loads(text)
+        return orjson.loads(text)
+
+
+    class _CaseTimeout(BaseException):
+        pass
+
+    def _on_alarm(signum, frame):
+        raise _CaseTimeout()
+
+    def _arity(fn):
+        # (required positional params, max positional params or None for *args)
+        try:
+            params = inspect.signature(fn).parameters.values()
+        except (TypeError, ValueError):
+            return None
+        positional = [p for p in params if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)]
+        required = sum(1 for p in positional if p.default is p.empty)
+        variadic = any(p.kind == p.VAR_POSITIONAL for p in params)
+        return required, None if variadic else len(positional)
+
+    def _call(fn, arity, fargs, fkwargs):
+        # Call shape is decided from the signature: solve(*args), solve(args), solve(*args[0])
+        if arity is None:
+            return fn(*fargs, **fkwargs)
+        required, maximum = arity
+
+        def fits(n):
+            return n >= required and (maximum is None or n <= maximum)
+
+        if fits(len(fargs)):
+            return fn(*fargs, **fkwargs)
+        if fits(1):
+            return fn(fargs, **fkwargs)
+        if len(fargs) == 1 and isinstance(fargs[0], (list, tuple)) and fits(len(fargs[0])):
+            return fn(*fargs[0], **fkwargs)
+        raise RuntimeError("Could not match function signature")
+
+    # One entry per payload: [ok, stdout, stderr, runtime_ms]
+    request = _loads(sys.stdin.buffer.read().decode("utf-8"))
+    timeout = request["timeout"]
+    fn = globals().get('solve')
+    arity = _arity(fn) if fn is not None else None
+    signal.signal(signal.SIGALRM, _on_alarm)
+    results = []
+    for payload in request["batch"]:
+        if fn is None:
+            results.append([True, _dumps({{"error": "No 'solve' function found in generated code"}}), "", 0])
+            continue
         if isinstance(payload, dict):
             fargs = payload.get("args", [])
-            fkwargs = payload.get("kwargs", {{}}
-)
+            fkwargs = payload.get("kwargs", {{}})
         else:
             fargs, fkwargs = payload, {{}}
 
-        if 'solve' not in globals():
-            print(json.dumps({{"error": "No 'solve' function found in generated code"}}))
-            sys.exit(1)
-
-        fn = globals()['solve']
-
-        # Flexible call strategy
+        start = time.time()
+        signal.setitimer(signal.ITIMER_REAL, timeout)
         try:
-            result = fn(*fargs, **fkwargs)
-        except TypeError:
-            try:
-                result = fn(fargs, **fkwargs)
-            except TypeError:
-                if isinstance(fargs, list) and len(fargs) == 1:
-                    try:
-                        result = fn(*fargs[0], **fkwargs)
-                    except Exception:
-                        result = fn(fargs[0], **fkwargs)
-                else:
-                    print(json.dumps({{"error": "Could not match function signature"}}))
-                    sys.exit(1)
+            out = _dumps(_call(fn, arity, fargs, fkwargs))
+        except _CaseTimeout:
+            results.append([False, "", f"Timeout after {{timeout}}s", timeout * 1000])
+            continue
+        except BaseException as e:
+            # exit() / SystemExit from one case must not take down the whole batch
+            out = _dumps({{"error": str(e) or type(e).__name__}})
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        results.append([True, out, "", int((time.time() - start) * 1000)])
 
-        print(json.dumps(result))
+    # Start on a fresh line: the solution may have printed without a trailing newline
+    sys.stdout.write("\\n" + _dumps(results) + "\\n")
 
-    except Exception as e:
-        print(json.dumps({{"error": str(e)}}))
-        sys.exit(1)
+
+if __name__ == "__main__":
+    _run_harness()
 """
-        tmpdir = tempfile.mkdtemp(prefix="code_solver_")
-        path = os.path.join(tmpdir, "solution.py")
-        with open(path, "w", encoding="utf-8") as f:
+        solutions_dir = _get_solutions_dir()
+        path = os.path.join(solutions_dir, f"solution_{key}.py")
+        # Write-then-rename so a concurrent run of the same code never sees a partial file
+        fd, tmp = tempfile.mkstemp(dir=solutions_dir, prefix=".tmp_", suffix=".py")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
             f.write(wrapper)
+        os.replace(tmp, path)
+
+        with self._solution_cache_lock:
+            self._solution_cache[key] = path
+            self._solution_cache.move_to_end(key)
+            while len(self._solution_cache) > self.SOLUTION_CACHE_MAX:
+                _, evicted = self._solution_cache.popitem(last=False)
+                try:
+                    os.unlink(evicted)
+                except OSError:
+                    pass
         return path
 
+    def _check_solution(self, generated_code: str) -> None:
+        """Validate code for in-memory execution, once per unique solution."""
+        key = _code_hash(generated_code)
+        if key not in self._validated:
+            self._validate_code_safety(generated_code)
+            self._validated.add(key)
+
     # -------------------------------------------------------------------------
     # EXECUTION
     # -------------------------------------------------------------------------
-    def _exec_solution(self, solution_path: str, input_payload: Dict[str, Any], timeout: Optional[int] = None
-                       ) -> Tuple[bool, str, str, int]:
-        """Safely execute generated code with timeout and capture output."""
+    # Slack for interpreter start-up on top of the per-case timeouts
+    BATCH_TIMEOUT_GRACE = 5
+
+    def _batch_command(self, solution_path: str, input_payloads: List[List[Any]],
+                       timeout: int) -> Tuple[List[str], bytes, int]:
+        """Command line, stdin body and overall timeout for one batch."""
+        request = {"batch": input_payloads, "timeout": timeout}
+        body = _dumps(request).encode("utf-8")
+        return [sys.executable, solution_path], body, timeout * len(input_payloads) + self.BATCH_TIMEOUT_GRACE
+
+    @staticmethod
+    def _parse_batch_output(stdout: str, stderr: str, count: int, runtime_ms: int
+                            ) -> List[_Outcome]:
+        # The harness prints its results last; anything the solution printed comes before
+        try:
+            results = _loads(stdout.rstrip().rpartition("\n")[2])
+        except ValueError:
+            results = None
+        if not isinstance(results, list) or len(results) != count:
+            # The solution failed before reaching the harness (syntax error, top-level exception)
+            error = stderr.strip() or "Execution failed"
+            return [(None, error, runtime_ms)] * count
+        return [CodeRunner._parse_case(*r) for r in results]
+
+    @staticmethod
+    def _parse_case(ok: bool, stdout: str, stderr: str, runtime_ms: int) -> _Outcome:
+        """Turn one harness entry [ok, stdout, stderr, runtime_ms] into an outcome."""
+        if not ok:
+            return None, stderr or "Execution failed", runtime_ms
+        try:
+            parsed = _loads(stdout)
+        except Exception:
+            return stdout, None, runtime_ms
+        if isinstance(parsed, dict) and "error" in parsed:
+            return None, parsed["error"], runtime_ms
+        return parsed, None, runtime_ms
+
+    def _exec_solution(self, solution_path: str, input_payloads: List[List[Any]],
+                       timeout: Optional[int] = None) -> List[_Outcome]:
+        """
+        Execute every payload in one subprocess and capture per-case output.
+
+        The child enforces the per-case timeout itself, so one slow case only
+        costs its own result; the outer timeout just bounds the whole batch.
+        Cases share the one interpreter, so module globals and mutable default
+        arguments (`def solve(x, acc=[])`) carry over from one case to the next.
+        """
         timeout = timeout or self.default_timeout
-        cmd = ["python", solution_path, "--input", json.dumps(input_payload)]
+        cmd, body, batch_timeout = self._batch_command(solution_path, input_payloads, timeout)
         start = time.time()
         try:
-            completed = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
-            runtime_ms = int((time.time() - start) * 1000)
-            return True, completed.stdout.strip(), completed.stderr.strip(), runtime_ms
+            # Own session, so a timeout can kill anything the solution started, too
+            proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                    stderr=subprocess.PIPE, start_new_session=True)
+        except Exception as e:
+            return [(None, str(e), int((time.time() - start) * 1000))] * len(input_payloads)
+        try:
+            # The payload goes through stdin: no ARG_MAX limit and no copy into argv
+            stdout, stderr = proc.communicate(body, timeout=batch_timeout)
         except subprocess.TimeoutExpired:
-            return False, "", f"Timeout after {timeout}s", timeout * 1000
+            self._kill_group(proc.pid)
+            proc.communicate()
+            return [(None, f"Timeout after {timeout}s", timeout * 1000)] * len(input_payloads)
+        return self._parse_batch_output(stdout.decode("utf-8", "replace"), stderr.decode("utf-8", "replace"),
+                                        len(input_payloads), int((time.time() - start) * 1000))
+
+    @staticmethod
+    def _kill_group(pid: int) -> None:
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    async def _exec_solution_async(self, solution_path: str, input_payloads: List[List[Any]],
+                                   timeout: Optional[int] = None) -> List[_Outcome]:
+        """Event-loop version of `_exec_solution`: waits on the subprocess without a thread."""
+        timeout = timeout or self.default_timeout
+        cmd, body, batch_timeout = self._batch_command(solution_path, input_payloads, timeout)
+        start = time.time()
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE, start_new_session=True
+            )
         except Exception as e:
-            return False, "", str(e), int((time.time() - start) * 1000)
+            return [(None, str(e), int((time.time() - start) * 1000))] * len(input_payloads)
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(body), timeout=batch_timeout)
+        except asyncio.TimeoutError:
+            self._kill_group(proc.pid)
+            await proc.wait()
+            return [(None, f"Timeout after {timeout}s", timeout * 1000)] * len(input_payloads)
+        except asyncio.CancelledError:
+            # The caller gave up on this run (e.g. a client disconnect); don't
+            # leave the batch and anything it spawned running
+            self._kill_group(proc.pid)
+            await proc.wait()
+            raise
+        return self._parse_batch_output(stdout.decode("utf-8", "replace"), stderr.decode("utf-8", "replace"),
+                                        len(input_payloads), int((time.time() - start) * 1000))
+
+    @staticmethod
+    def _split_batches(input_payloads: List[List[Any]]) -> List[List[List[Any]]]:
+        """One contiguous batch per CPU (at most one per payload)."""
+        workers = max(1, min(len(input_payloads), os.cpu_count() or 1))
+        size = -(-len(input_payloads) // workers) or 1
+        return [input_payloads[i:i + size] for i in range(0, len(input_payloads), size)]
+
+    def _exec_parallel(self, solution_path: str, input_payloads: List[List[Any]],
+                       timeout: Optional[int] = None) -> List[_Outcome]:
+        """
+        Split the payloads into one batch per CPU and run the batches concurrently.
+
+        Each batch is a separate subprocess, so wall time is bounded by the
+        slowest batch rather than the sum of all cases. Threads are enough here:
+        they only wait on their subprocess.
+        """
+        chunks = self._split_batches(input_payloads)
+        if len(chunks) <= 1:
+            return self._exec_solution(solution_path, input_payloads, timeout)
+        with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+            futures = [executor.submit(self._exec_solution, solution_path, chunk, timeout) for chunk in chunks]
+            return [outcome for future in futures for outcome in future.result()]
+
+    async def _exec_parallel_async(self, solution_path: str, input_payloads: List[List[Any]],
+                                   timeout: Optional[int] = None) -> List[_Outcome]:
+        """Same batching as `_exec_parallel`, with the subprocesses awaited concurrently."""
+        chunks = self._split_batches(input_payloads)
+        batches = await asyncio.gather(
+            *(self._exec_solution_async(solution_path, chunk, timeout) for chunk in chunks)
+        )
+        return [outcome for batch in batches for outcome in batch]
 
     # -------------------------------------------------------------------------
     # MAIN TEST RUN
@@ -154,56 +893,106 @@ if __name__ == "__main__":
                   test_cases: List[Tuple[List[Any], Any]],
                   llm_trajectory=None, timeout: Optional[int] = None) -> Dict[str, Any]:
         """Run multiple test cases and return structured results."""
-        results = []
-        passed = 0
-        total = len(test_cases)
         exec_timeout = timeout or self.default_timeout
+        try:
+            solution_path = self._prepare_solution(generated_code)
+        except RuntimeError as e:
+            return self._blocked_record(problem_text, generated_code, str(e), llm_trajectory)
+
+        if self._pool is not None:
+            # In-process workers take the inputs as-is: no payload dicts, no JSON
+            outcomes = self._pool.run(generated_code, [inp for inp, _ in test_cases], exec_timeout)
+        else:
+            outcomes = self._exec_parallel(solution_path, self._payloads(test_cases), exec_timeout)
+        return self._score(problem_text, generated_code, test_cases, outcomes, llm_trajectory)
 
+    async def run_tests_async(self, problem_text: str, generated_code: str,
+                              test_cases: List[Tuple[List[Any], Any]],
+                              llm_trajectory=None, timeout: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Async version of `run_tests` for callers already on an event loop.
+
+        Subprocess batches are awaited directly instead of blocking a
+        threadpool thread each; the worker pool path waits in a thread.
+        """
+        exec_timeout = timeout or self.default_timeout
         try:
-            solution_path = self._make_solution_file(generated_code)
+            solution_path = self._prepare_solution(generated_code)
         except RuntimeError as e:
-            return {
-                "run_id": str(int(time.time() * 1000)),
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "problem_text": problem_text,
-                "solution_code": generated_code,
-                "test_cases": [],
-                "score": 0.0,
-                "error": str(e),
-                "llm_trajectory": llm_trajectory or [],
-            }
-
-        for inp, expected in test_cases:
-            payload = {"args": inp if isinstance(inp, list) else [inp]}
-            ok, stdout, stderr, runtime_ms = self._exec_solution(solution_path, payload, exec_timeout)
-            output, error, passed_case = None, None, False
-
-            if not ok:
-                error = stderr or "Execution failed"
-            else:
+            return self._blocked_record(problem_text, generated_code, str(e), llm_trajectory)
+
+        if self._pool is not None:
+            outcomes = await asyncio.to_thread(
+                self._pool.run, generated_code, [inp for inp, _ in test_cases], exec_timeout
+            )
+        else:
+            outcomes = await self._exec_parallel_async(solution_path, self._payloads(test_cases), exec_timeout)
+        return self._score(problem_text, generated_code, test_cases, outcomes, llm_trajectory)
+
+    def _prepare_solution(self, generated_code: str) -> Optional[str]:
+        """Validate the code; returns the wrapper path (None on the worker pool path)."""
+        if self._pool is not None:
+            self._check_solution(generated_code)
+            return None
+        return self._make_solution_file(generated_code)
+
+    @staticmethod
+    def _payloads(test_cases: List[Tuple[List[Any], Any]]) -> List[List[Any]]:
+        # The harness takes a bare argument list per case ({"args": ...} dicts still work)
+        return [inp if isinstance(inp, list) else [inp] for inp, _ in test_cases]
+
+    @staticmethod
+    def _blocked_record(problem_text: str, generated_code: str, error: str,
+                        llm_trajectory=None) -> Dict[str, Any]:
+        return {
+            "run_id": _new_run_id(),
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "problem_text": problem_text,
+            "solution_code": generated_code,
+            "test_cases": [],
+            "score": 0.0,
+            "error": error,
+            "llm_trajectory": llm_trajectory or [],
+        }
+
+    @staticmethod
+    def _score(problem_text: str, generated_code: str, test_cases: List[Tuple[List[Any], Any]],
+               outcomes: List[_Outcome], llm_trajectory=None) -> Dict[str, Any]:
+        """Compare execution outcomes against expected outputs and build the run record."""
+        results = []
+        passed = 0
+        total = len(test_cases)
+
+        expected_digests = _expected_digests(test_cases)
+        # Cases often return identical outputs; hash each distinct encoding once
+        output_digests: Dict[str, Optional[bytes]] = {}
+        for (inp, expected), expected_digest, (output, error, runtime_ms) in zip(
+                test_cases, expected_digests, outcomes):
+            passed_case = False
+            output_text = None
+            if error is None and output is not None:
+                # Worker pool results arrive as Python objects; hold them to the JSON contract
                 try:
-                    parsed = json.loads(stdout)
-                    if isinstance(parsed, dict) and "error" in parsed:
-                        error = parsed["error"]
-                    else:
-                        output = parsed
-                except Exception:
-                    output = stdout
+                    output_text = _dumps(output)
+                except TypeError as e:
+                    output, error = None, str(e)
 
             if error is None:
                 try:
-                    passed_case = (output == expected) or (
-                        json.dumps(output, sort_keys=True) == json.dumps(expected, sort_keys=True)
-                    )
+                    passed_case = output == expected
                 except Exception:
-                    passed_case = (output == expected)
+                    passed_case = False
+                if not passed_case and expected_digest is not None and output_text is not None:
+                    if output_text not in output_digests:
+                        output_digests[output_text] = _digest(output)
+                    passed_case = output_digests[output_text] == expected_digest
                 if passed_case:
                     passed += 1
 
             results.append({
-                "input": json.dumps(inp),
-                "expected_output": json.dumps(expected),
-                "output": json.dumps(output) if output is not None else None,
+                "input": _dumps(inp),
+                "expected_output": _dumps(expected),
+                "output": output_text,
                 "passed": passed_case,
                 "error": error,
                 "runtime_ms": runtime_ms,
@@ -212,7 +1001,7 @@ if __name__ == "__main__":
         score = passed / total if total else 0.0
 
         return {
-            "run_id": str(int(time.time() * 1000)),
+            "run_id": _new_run_id(),
             "timestamp": datetime.utcnow().isoformat() + "Z",
             "problem_text": problem_text,
             "solution_code": generated_code,
@@ -223,11 +1012,15 @@ if __name__ == "__main__":
         }
 
 
+# Shared default runner: one instance per process, so its solution and
+# validation caches are reused across requests
+_default_runner = CodeRunner()
+
+
 # -------------------------------------------------------------------------
 # Backward-compatible function
 # -------------------------------------------------------------------------
 def run(problem_text: str, generated_code: str,
         test_cases: List[Tuple[List[Any], Any]], llm_trajectory=None):
     """Convenience wrapper for backwards compatibility."""
-    runner = CodeRunner()
-    return runner.run_tests(problem_text, generated_code, test_cases, llm_trajectory)
+    return _default_runner.run_tests(problem_text, generated_code, test_cases, llm_trajectory)
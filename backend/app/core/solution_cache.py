@@ -0,0 +1,55 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils.file_ops import RUNS_DIR
+
+CACHE_DIR = os.path.join(RUNS_DIR, "cache")
+
+
+def make_key(problem: str, test_cases: List[Tuple[List[Any], Any]], model: str,
+             temperature: float, max_tokens: int, prompt_hash: str) -> str:
+    """
+    Stable SHA-256 key for a single-shot solve request.
+
+    Covers everything that shapes the generated code: the problem and test
+    cases, the model settings, and `prompt_hash` (a hash of the system prompt
+    and user guidelines), so editing the prompt template misses the cache.
+    """
+    payload = json.dumps(
+        {"problem": problem, "tests": test_cases, "model": model, "T": temperature,
+         "max_tokens": max_tokens, "prompt": prompt_hash},
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _path(key: str) -> str:
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def get(key: str) -> Optional[Dict[str, Any]]:
+    """Return the cached record for `key`, or None on a miss."""
+    try:
+        with open(_path(key), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def set(key: str, record: Dict[str, Any]) -> None:
+    """Persist `record` under `key` (atomic write via tempfile + rename)."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, prefix=".tmp_", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.replace(tmp, _path(key))
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
@@ -1,9 +1,28 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .api.routes_generate import router as generate_router
 from .api.routes_results import router as results_router
+from .core.llm import aclose_shared_http_client
+from .core.runner import _default_runner
+from .utils.file_ops import run_writer
 
-app = FastAPI(title="CodeSolverAgent")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Routes solve through the shared default CodeRunner; start its workers
+    # (if the pool is enabled) before serving traffic
+    _default_runner.start()
+    yield
+    _default_runner.close()
+    await aclose_shared_http_client()
+    # Make sure queued run records reach disk before the worker exits
+    run_writer.drain()
+
+
+# Responses use FastAPI's default JSON serialization; /generate_solution's
+# response_model is serialized by pydantic directly (ORJSONResponse is deprecated)
+app = FastAPI(title="CodeSolverAgent", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
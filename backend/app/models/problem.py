@@ -4,6 +4,8 @@ from typing import Any, List, Optional
 class GenerateRequest(BaseModel):
     problem: str
     test_cases: List[List[Any]]
+    # False solves again instead of returning a cached passing solution
+    use_cache: bool = True
 
 class TestResult(BaseModel):
     input: str
@@ -26,3 +28,9 @@ class RunSummary(BaseModel):
     timestamp: str
     score: float
     problem_preview: str
+
+# Finish schema/validator construction at import time rather than on first request
+GenerateRequest.model_rebuild()
+TestResult.model_rebuild()
+GenerateResponse.model_rebuild()
+RunSummary.model_rebuild()
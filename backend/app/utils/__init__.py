@@ -5,10 +5,14 @@ This module contains helper functions for file operations, data persistence,
 and other utility functions.
 """
 
-from .file_ops import save_run, list_runs, load_run
+from .file_ops import save_run, list_runs, list_run_summaries, load_run
+from .json_io import loads_json, load_json_file
 
 __all__ = [
     'save_run',
     'list_runs', 
-    'load_run'
+    'list_run_summaries',
+    'load_run',
+    'loads_json',
+    'load_json_file'
 ]
@@ -1,25 +1,374 @@
-import json
+import atexit
+import contextlib
+import fcntl
+import logging
 import os
-from typing import Dict, List
+import queue
+import threading
+from collections import OrderedDict
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import orjson
+
+logger = logging.getLogger(__name__)
 
 RUNS_DIR = os.path.join(os.path.dirname(__file__), "..", "runs")
 os.makedirs(RUNS_DIR, exist_ok=True)
 
-def save_run(record: Dict) -> Dict:
-    run_id = record.get("run_id")
-    path = os.path.join(RUNS_DIR, f"run_{run_id}.json")
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(record, f, indent=2)
-    return record
+# Append-only run log: one compact JSON record per line, oldest first
+RUNS_LOG_PATH = os.path.join(RUNS_DIR, "runs.jsonl")
+
+# Sidecar index: one small summary line per saved run, oldest first. Runs in
+# the log also carry their byte "offset" and "length" there
+INDEX_PATH = os.path.join(RUNS_DIR, "_index.jsonl")
+PREVIEW_CHARS = 100
+_index_lock = threading.Lock()
+
+# flock()ed by every process while it appends to the log and index (the API
+# server, CLI and evaluator all write runs), so offsets are taken at the true end
+LOCK_PATH = os.path.join(RUNS_DIR, ".runs.lock")
+
+# Parsed full records of recently loaded runs (run_id -> record, oldest first)
+LOADED_RUNS_MAX = 256
+_loaded_runs: "OrderedDict[str, Dict]" = OrderedDict()
+_loaded_runs_lock = threading.Lock()
+
+# run_id -> (offset, length) in the run log, filled from the index on lookup misses;
+# _index_scanned is how many bytes of the index have been read into it
+_run_offsets: Dict[str, Tuple[int, int]] = {}
+_index_scanned = 0
+
+# In-memory summaries of the most recent runs (run_id -> summary, oldest first),
+# so listing runs never touches the disk after the first call
+RECENT_RUNS_MAX = 1024
+_recent_runs: "OrderedDict[str, Dict]" = OrderedDict()
+_recent_runs_lock = threading.Lock()
+_recent_runs_loaded = False
+# Bytes of the index already folded into the cache; other processes append past it
+_recent_index_seen = 0
+
+
+def _summarize(record: Dict) -> Dict:
+    problem_text = record.get("problem_text", "")
+    problem_preview = problem_text[:PREVIEW_CHARS]
+    if len(problem_text) > PREVIEW_CHARS:
+        problem_preview += "..."
+    return {
+        "run_id": record.get("run_id"),
+        "timestamp": record.get("timestamp", ""),
+        "score": record.get("score", 0.0),
+        "problem_preview": problem_preview,
+    }
+
+
+def _append_index(entries: List[Dict]) -> None:
+    with open(INDEX_PATH, "ab") as f:
+        f.write(b"".join(orjson.dumps(e) + b"\n" for e in entries))
+
+
+def _index_entry(record: Dict, offset: Optional[int] = None, length: Optional[int] = None) -> Dict:
+    entry = _summarize(record)
+    if offset is not None:
+        entry["offset"] = offset
+        entry["length"] = length
+    return entry
+
+
+def _split_entry(entry: Dict) -> Dict:
+    """Strip log position fields off an index entry (noting them), leaving its summary."""
+    offset = entry.pop("offset", None)
+    length = entry.pop("length", None)
+    if offset is not None:
+        # The latest entry for an id wins, as it does for the writer
+        _run_offsets[str(entry["run_id"])] = (offset, length)
+    return entry
+
+
+@contextlib.contextmanager
+def _runs_file_lock() -> Iterator[None]:
+    """Hold the cross-process lock on the run log and index."""
+    with open(LOCK_PATH, "ab") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _ensure_index() -> None:
+    """Create the index on first use, folding in run files saved before it existed."""
+    with _index_lock:
+        if not os.path.exists(INDEX_PATH):
+            with _runs_file_lock():
+                if not os.path.exists(INDEX_PATH):
+                    _rebuild_index()
+
+
+def _rebuild_index() -> None:
+    # Legacy per-run files predate the log, so they go first
+    entries = []
+    for fname in reversed(_scan_run_files()):
+        try:
+            entries.append(_index_entry(_read_run_file(fname[len("run_"):-len(".json")])))
+        except (OSError, ValueError):
+            continue
+    for offset, line in _iter_log():
+        try:
+            entries.append(_index_entry(orjson.loads(line), offset, len(line)))
+        except ValueError:
+            continue
+    _append_index(entries)
+
+
+def _iter_log() -> Iterator[Tuple[int, bytes]]:
+    """Yield (offset, line) for every record line in the run log."""
+    if not os.path.exists(RUNS_LOG_PATH):
+        return
+    offset = 0
+    with open(RUNS_LOG_PATH, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield offset, line
+            offset += len(line)
+
+
+def _append_log(records: List[Dict]) -> List[Tuple[Dict, int, int]]:
+    """Append records to the run log in one write; returns (record, offset, length) for each."""
+    encoded = []
+    for record in records:
+        try:
+            encoded.append((record, orjson.dumps(record) + b"\n"))
+        except TypeError:
+            logger.exception("Failed to save run %s", record.get("run_id"))
+    with open(RUNS_LOG_PATH, "ab") as f:
+        offset = f.seek(0, os.SEEK_END)
+        f.write(b"".join(line for _, line in encoded))
+    placed = []
+    for record, line in encoded:
+        placed.append((record, offset, len(line)))
+        offset += len(line)
+    return placed
+
+
+def _read_index_from(start: int) -> Tuple[List[bytes], int]:
+    """Complete index lines from byte `start` on, and the offset just past them."""
+    with open(INDEX_PATH, "rb") as f:
+        if start > os.fstat(f.fileno()).st_size:
+            start = 0  # index was rebuilt
+        f.seek(start)
+        data = f.read()
+    # A line still being written by another process has no newline yet
+    end = data.rfind(b"\n") + 1
+    return data[:end].splitlines(), start + end
+
+
+def _scan_run_offsets() -> None:
+    """Read log positions from index lines added since the last scan (by any process)."""
+    global _index_scanned
+    _ensure_index()
+    with _index_lock:
+        lines, _index_scanned = _read_index_from(_index_scanned)
+        for line in lines:
+            try:
+                _split_entry(orjson.loads(line))
+            except ValueError:
+                continue
 
-def list_runs() -> List[str]:
-    files = [f for f in os.listdir(RUNS_DIR) if f.startswith("run_") and f.endswith(".json")]
+
+def _read_log_record(run_id: str) -> Optional[Dict]:
+    position = _run_offsets.get(run_id)
+    if position is None:
+        # Possibly saved since the last scan, maybe by another process
+        _scan_run_offsets()
+        position = _run_offsets.get(run_id)
+    if position is None:
+        return None
+    offset, length = position
+    with open(RUNS_LOG_PATH, "rb") as f:
+        return orjson.loads(os.pread(f.fileno(), length, offset))
+
+
+def _tail_lines(path: str, n: int, block_size: int = 8192) -> List[bytes]:
+    """Return the last `n` non-empty lines of `path`, reading backwards from the end."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        data = b""
+        while pos > 0 and data.count(b"\n") <= n:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    lines = [line for line in data.splitlines() if line.strip()]
+    return lines[-n:]
+
+
+def _scan_run_files() -> List[str]:
+    """Legacy per-run file names, newest first."""
+    # scandir's entries carry their type, so is_file() costs no extra stat
+    with os.scandir(RUNS_DIR) as it:
+        files = [e.name for e in it if e.name.startswith("run_") and e.name.endswith(".json") and e.is_file()]
     files.sort(reverse=True)
     return files
 
-def load_run(run_id: str) -> Dict:
+
+def _remember_run(summary: Dict) -> None:
+    with _recent_runs_lock:
+        _recent_runs[summary["run_id"]] = summary
+        _recent_runs.move_to_end(summary["run_id"])
+        while len(_recent_runs) > RECENT_RUNS_MAX:
+            _recent_runs.popitem(last=False)
+
+
+def _load_recent_runs() -> None:
+    """Seed the recent-runs cache from the tail of the index, then pick up runs appended since."""
+    global _recent_runs_loaded, _recent_index_seen
+    if _recent_runs_loaded:
+        if os.path.getsize(INDEX_PATH) > _recent_index_seen:
+            with _index_lock:
+                lines, _recent_index_seen = _read_index_from(_recent_index_seen)
+            for line in lines:
+                try:
+                    _remember_run(_split_entry(orjson.loads(line)))
+                except ValueError:
+                    continue
+        return
+    _ensure_index()
+    _recent_index_seen = os.path.getsize(INDEX_PATH)
+    loaded: "OrderedDict[str, Dict]" = OrderedDict()
+    for line in _tail_lines(INDEX_PATH, RECENT_RUNS_MAX):
+        try:
+            summary = _split_entry(orjson.loads(line))
+        except ValueError:
+            continue
+        loaded[summary["run_id"]] = summary
+    with _recent_runs_lock:
+        # Runs saved by this process before the first listing are newer than the index
+        for run_id, summary in _recent_runs.items():
+            loaded.pop(run_id, None)
+            loaded[run_id] = summary
+        while len(loaded) > RECENT_RUNS_MAX:
+            loaded.popitem(last=False)
+        _recent_runs.clear()
+        _recent_runs.update(loaded)
+        _recent_runs_loaded = True
+
+
+def _read_run_file(run_id: str) -> Dict:
     path = os.path.join(RUNS_DIR, f"run_{run_id}.json")
     if not os.path.exists(path):
         raise FileNotFoundError(run_id)
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+
+class RunWriter:
+    """
+    Persists run records on a background thread so save_run never blocks a request.
+
+    Records are queued and written in batches: one append to the run log and
+    one to the index per batch. Queued records stay readable through
+    `pending()` until they are on disk; call `drain()` to wait for the queue.
+    """
+
+    def __init__(self):
+        self._queue: "queue.Queue[Dict]" = queue.Queue()
+        self._pending: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, record: Dict) -> None:
+        """Queue a record for writing and start the writer thread if needed."""
+        with self._lock:
+            self._pending[str(record.get("run_id"))] = record
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="run-writer", daemon=True)
+                self._thread.start()
+        self._queue.put(record)
+
+    def pending(self, run_id: str) -> Optional[Dict]:
+        """Return the record for `run_id` if it is still queued, else None."""
+        with self._lock:
+            return self._pending.get(str(run_id))
+
+    def drain(self) -> None:
+        """Block until every queued record has been written."""
+        self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch: List[Dict]) -> None:
+        try:
+            with _index_lock, _runs_file_lock():
+                placed = _append_log(batch)
+                for record, offset, length in placed:
+                    _run_offsets[str(record.get("run_id"))] = (offset, length)
+                if os.path.exists(INDEX_PATH):
+                    _append_index([_index_entry(*p) for p in placed])
+                else:
+                    # First indexed save also picks up older runs (including these)
+                    _rebuild_index()
+        except Exception:
+            logger.exception("Failed to save runs %s", [r.get("run_id") for r in batch])
+        finally:
+            with self._lock:
+                for record in batch:
+                    self._pending.pop(str(record.get("run_id")), None)
+
+
+run_writer = RunWriter()
+# Flush queued runs before the interpreter exits (CLI, evaluate.py)
+atexit.register(run_writer.drain)
+
+
+def save_run(record: Dict) -> Dict:
+    _remember_run(_summarize(record))
+    # Run ids are millisecond timestamps; never serve an older record under a reused id
+    with _loaded_runs_lock:
+        _loaded_runs.pop(str(record.get("run_id")), None)
+    run_writer.submit(record)
+    return record
+
+def list_runs(limit: Optional[int] = None) -> List[str]:
+    """Return run names (`run_<id>.json`), newest first (at most RECENT_RUNS_MAX)."""
+    return [f"run_{s['run_id']}.json" for s in list_run_summaries(limit or RECENT_RUNS_MAX)]
+
+def list_run_summaries(limit: int) -> List[Dict]:
+    """Return summaries of the `limit` most recent runs, newest first."""
+    _load_recent_runs()
+    with _recent_runs_lock:
+        return list(islice(reversed(_recent_runs.values()), limit))
+
+def load_run(run_id: str) -> Dict:
+    record = run_writer.pending(run_id)
+    if record is not None:
+        return record
+    run_id = str(run_id)
+    with _loaded_runs_lock:
+        record = _loaded_runs.get(run_id)
+        if record is not None:
+            _loaded_runs.move_to_end(run_id)
+            return record
+
+    record = _read_log_record(run_id)
+    if record is None:
+        # Runs saved before the log existed have their own file
+        record = _read_run_file(run_id)
+    with _loaded_runs_lock:
+        _loaded_runs[run_id] = record
+        while len(_loaded_runs) > LOADED_RUNS_MAX:
+            _loaded_runs.popitem(last=False)
+    return record
@@ -0,0 +1,36 @@
+import json
+import re
+from typing import Any, Union
+
+import orjson
+
+# orjson reads integers beyond 64 bits back as floats, so any text with a
+# 19+ digit run is decoded by json instead (big-int answers are common here)
+_LONG_NUMBER_RE = re.compile(r"\d{19}")
+_LONG_NUMBER_BYTES_RE = re.compile(rb"\d{19}")
+
+
+def loads_json(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+    """
+    Decode JSON text or bytes (including a memoryview over an mmap).
+
+    orjson does the work unless the data has a 19+ digit number or uses the
+    non-standard constants (NaN, Infinity) orjson rejects; stdlib json takes
+    those. Invalid JSON raises json.JSONDecodeError (a ValueError).
+    """
+    if isinstance(data, str):
+        long_number = _LONG_NUMBER_RE.search(data)
+    else:
+        long_number = _LONG_NUMBER_BYTES_RE.search(data)
+    if not long_number:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data if isinstance(data, (str, bytes, bytearray)) else bytes(data))
+
+
+def load_json_file(path: str) -> Any:
+    """Read and decode a JSON file with `loads_json`."""
+    with open(path, "rb") as f:
+        return loads_json(f.read())
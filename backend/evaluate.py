@@ -1,10 +1,85 @@
-import json
+import argparse
+import asyncio
 import sys
 import os
-from typing import List, Dict, Any, Optional
-sys.path.insert(0, os.path.dirname(__file__))
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from operator import itemgetter
+from typing import BinaryIO, List, Dict, Any, Optional, Tuple, Union
 
-from app.core.agent import CodeSolverAgent
+import orjson
+
+from .app.core import solution_cache
+from .app.core.agent import CodeSolverAgent
+from .app.core.llm import aclose_shared_http_client
+from .app.utils.json_io import load_json_file
+
+# Defaults resolve next to this file, whatever the working directory
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+EVAL_SET_PATH = os.path.join(BACKEND_DIR, "eval_set.json")
+EVAL_RUNS_DIR = os.path.join(BACKEND_DIR, "runs")
+
+# An eval set with its test cases parsed: (problem, [(inputs, expected), ...]) each
+PreparedProblem = Tuple[str, List[Tuple[List[Any], Any]]]
+PreparedEvalSet = List[PreparedProblem]
+# What evaluate() accepts: a file path, its loaded contents, or a prepared eval set
+EvalSetSource = Union[str, List[Dict[str, Any]], PreparedEvalSet]
+
+_passed = itemgetter("passed")
+
+
+# Parsed eval sets keyed by (path, mtime, size), so repeated evaluations
+# (compare_models, evaluate_subset loops) parse each file once. Callers
+# share the cached list and must not modify it
+_EVAL_SETS_MAX = 8
+_eval_sets: "OrderedDict[Tuple[str, int, int], List[Dict[str, Any]]]" = OrderedDict()
+_eval_sets_lock = threading.Lock()
+
+
+def _load_eval_set(path: str) -> List[Dict[str, Any]]:
+    st = os.stat(path)
+    key = (os.path.realpath(path), st.st_mtime_ns, st.st_size)
+    with _eval_sets_lock:
+        eval_set = _eval_sets.get(key)
+        if eval_set is not None:
+            _eval_sets.move_to_end(key)
+            return eval_set
+
+    eval_set = load_json_file(path)
+    with _eval_sets_lock:
+        _eval_sets[key] = eval_set
+        while len(_eval_sets) > _EVAL_SETS_MAX:
+            _eval_sets.popitem(last=False)
+    return eval_set
+
+
+def _write_file_atomic(path: str, data: bytes) -> None:
+    """Write `data` to `path` via a synced tempfile + rename, so readers never see a partial file."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+_print_lock = threading.Lock()
+
+
+def _write_out(text: str) -> None:
+    """Write a block of progress output to stdout in one locked call."""
+    with _print_lock:
+        sys.stdout.write(text)
+        sys.stdout.flush()
 
 
 class Evaluator:
@@ -15,107 +90,121 @@ class Evaluator:
     """
     
     def __init__(self, agent: Optional[CodeSolverAgent] = None, 
-                 output_file: str = "runs/eval_history.json"):
+                 output_file: str = os.path.join(EVAL_RUNS_DIR, "eval_history.json")):
         """
         Initialize Evaluator with agent and output configuration.
         
         Args:
-            agent: CodeSolverAgent instance to evaluate
-            output_file: Path to save evaluation results
+            agent: CodeSolverAgent instance to evaluate (a default one is
+                built on first use if omitted)
+            output_file: Path to save the evaluation summary; per-problem
+                results are streamed to the matching `.jsonl` file
         """
-        self.agent = agent or CodeSolverAgent()
+        self._agent = agent
         self.output_file = output_file
+        os.makedirs(os.path.dirname(self.output_file) or ".", exist_ok=True)
+        # eval set path -> (raw eval set, its prepared form)
+        self._prepared: Dict[str, Tuple[List[Dict[str, Any]], PreparedEvalSet]] = {}
     
-    def evaluate(self, eval_set_path: str = "eval_set.json", 
+    @property
+    def agent(self) -> CodeSolverAgent:
+        """The agent under evaluation, creating the default one on first access."""
+        if self._agent is None:
+            self._agent = CodeSolverAgent()
+        return self._agent
+    
+    @agent.setter
+    def agent(self, agent: CodeSolverAgent) -> None:
+        self._agent = agent
+    
+    @property
+    def results_file(self) -> str:
+        """JSON Lines file that per-problem results are appended to as they finish."""
+        return os.path.splitext(self.output_file)[0] + ".jsonl"
+    
+    def evaluate(self, eval_set_path: EvalSetSource = EVAL_SET_PATH, 
                  problem_filter: Optional[List[int]] = None,
                  enable_reflection: bool = False,
                  max_retries: int = 1,
-                 verbose: bool = True) -> Dict[str, Any]:
+                 verbose: bool = True,
+                 max_workers: int = 8,
+                 use_cache: bool = True) -> Dict[str, Any]:
         """
         Run evaluation on a set of problems.
         
         Args:
-            eval_set_path: Path to evaluation dataset
+            eval_set_path: Path to evaluation dataset, its already-loaded list of
+                problems, or an eval set prepared by `_prepare_eval_set`
             problem_filter: List of problem indices to evaluate (None for all)
             enable_reflection: Whether to enable self-reflection
             max_retries: Maximum reflection retries
             verbose: Whether to print progress
+            max_workers: Maximum problems solved concurrently (1 runs them in order)
+            use_cache: Whether to reuse stored results for problems solved before
+                (set False to force every problem to be solved again)
             
         Returns:
             Dictionary with evaluation results and metrics
         """
-        with open(eval_set_path, "r") as f:
-            eval_set = json.load(f)
+        async def run() -> Dict[str, Any]:
+            try:
+                return await self.evaluate_async(
+                    eval_set_path, problem_filter, enable_reflection, max_retries, verbose,
+                    max_workers, use_cache
+                )
+            finally:
+                # The loop ends with this run; don't leave its HTTP client behind
+                await aclose_shared_http_client()
+
+        # One event loop for the whole run so the async LLM client is reused
+        return asyncio.run(run())
+    
+    async def evaluate_async(self, eval_set_path: EvalSetSource = EVAL_SET_PATH, 
+                             problem_filter: Optional[List[int]] = None,
+                             enable_reflection: bool = False,
+                             max_retries: int = 1,
+                             verbose: bool = True,
+                             max_workers: int = 8,
+                             use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Async version of `evaluate` for callers already on an event loop.
         
-        # Apply problem filter if specified
-        if problem_filter is not None:
-            eval_set = [eval_set[i] for i in problem_filter if 0 <= i < len(eval_set)]
+        Takes the same arguments and returns the same dictionary.
+        """
+        eval_set = self._prepare_eval_set(eval_set_path)
         
-        total_tests = 0
-        total_passed = 0
-        results = []
+        # Every problem runs on the agent's one runner; start its pool workers up
+        # front. Without CODE_RUNNER_WORKER_POOL=1 (the default) this is a no-op
+        runner = getattr(self.agent, "runner", None)
+        if runner is not None:
+            await asyncio.to_thread(runner.start)
+        
+        # Apply problem filter if specified, remembering each problem's place in the full set
+        indices = None
+        if problem_filter is not None:
+            kept = [i for i in problem_filter if 0 <= i < len(eval_set)]
+            eval_set = [eval_set[i] for i in kept]
+            indices = [i + 1 for i in kept]
         
         if verbose:
-            print("=" * 80)
-            print("CODE-SOLVER AGENT EVALUATION")
-            print("=" * 80)
-            print()
-        
-        for i, item in enumerate(eval_set, 1):
-            problem = item["problem"]
-            test_cases = self.agent.parse_test_cases(item["test_cases"])
-            
-            if verbose:
-                print(f"Problem {i}/{len(eval_set)}: {problem[:60]}...")
-            
-            try:
-                record = self.agent.solve_problem(
-                    problem, test_cases, 
-                    enable_reflection=enable_reflection, 
-                    max_retries=max_retries
-                )
-                passed = sum(1 for tc in record["test_cases"] if tc["passed"])
-                total = len(record["test_cases"])
-                
-                total_tests += total
-                total_passed += passed
-                
-                result = {
-                    "problem": problem,
-                    "score": record["score"],
-                    "passed": passed,
-                    "total": total,
-                    "run_id": record["run_id"]
-                }
-                results.append(result)
-                
-                if verbose:
-                    print(f"  Score: {record['score']:.2%} ({passed}/{total})")
-                
-            except Exception as e:
-                if verbose:
-                    print(f"  Error: {e}")
-                results.append({
-                    "problem": problem,
-                    "score": 0.0,
-                    "passed": 0,
-                    "total": len(test_cases),
-                    "error": str(e)
-                })
-                total_tests += len(test_cases)
-            
-            if verbose:
-                print()
+            rule = "=" * 80
+            _write_out(f"{rule}\nCODE-SOLVER AGENT EVALUATION\n{rule}\n\n")
+        
+        with open(self.results_file, "wb") as results_out:
+            results, total_passed, total_tests = await self._run_eval_set(
+                eval_set, enable_reflection, max_retries, verbose, max_workers, use_cache,
+                results_out, indices
+            )
         
         eval_score = total_passed / total_tests if total_tests > 0 else 0.0
         
         if verbose:
-            print("=" * 80)
-            print("EVALUATION SUMMARY")
-            print("=" * 80)
-            print(f"Overall Score: {eval_score:.2%}")
-            print(f"Total Tests Passed: {total_passed}/{total_tests}")
-            print()
+            rule = "=" * 80
+            _write_out(
+                f"{rule}\nEVALUATION SUMMARY\n{rule}\n"
+                f"Overall Score: {eval_score:.2%}\n"
+                f"Total Tests Passed: {total_passed}/{total_tests}\n\n"
+            )
         
         eval_result = {
             "eval_score": eval_score,
@@ -129,16 +218,152 @@ class Evaluator:
             }
         }
         
-        # Save results
-        os.makedirs(os.path.dirname(self.output_file), exist_ok=True)
-        with open(self.output_file, "w") as f:
-            json.dump(eval_result, f, indent=2)
+        # Save a summary; the per-problem results are already in results_file
+        summary = {k: v for k, v in eval_result.items() if k != "results"}
+        summary["results_file"] = os.path.basename(self.results_file)
+        _write_file_atomic(self.output_file, orjson.dumps(summary, option=orjson.OPT_INDENT_2))
         
         if verbose:
-            print(f"Results saved to {self.output_file}")
+            print(f"Results saved to {self.output_file} and {self.results_file}")
         
         return eval_result
     
+    def _prepare_eval_set(self, eval_set_path: EvalSetSource) -> PreparedEvalSet:
+        """
+        Load an eval set and parse its test cases, once per file version.
+        
+        Already-loaded problems are parsed without touching the disk, and
+        already-prepared ones are passed through.
+        """
+        if not isinstance(eval_set_path, str):
+            return [
+                (item["problem"], self.agent.parse_test_cases(item["test_cases"]))
+                if isinstance(item, dict) else item
+                for item in eval_set_path
+            ]
+        raw = _load_eval_set(eval_set_path)
+        cached = self._prepared.get(eval_set_path)
+        if cached is not None and cached[0] is raw:
+            return cached[1]
+        prepared = [(item["problem"], self.agent.parse_test_cases(item["test_cases"])) for item in raw]
+        self._prepared[eval_set_path] = (raw, prepared)
+        return prepared
+    
+    async def _run_eval_set(self, eval_set: PreparedEvalSet, enable_reflection: bool,
+                            max_retries: int, verbose: bool, max_workers: int = 8,
+                            use_cache: bool = True,
+                            results_out: Optional[BinaryIO] = None,
+                            indices: Optional[List[int]] = None
+                            ) -> Tuple[List[Dict[str, Any]], int, int]:
+        """
+        Solve every problem in the eval set and aggregate per-problem results.
+        
+        Problems are solved concurrently (LLM latency dominates), at most
+        `max_workers` at a time; results keep the eval set's order. With
+        `use_cache`, duplicate problems in the set are solved once. Each
+        result is appended to `results_out` as a JSON line as soon as its
+        problem finishes. The line's "index" is the problem's 1-based place in
+        the full eval set: `indices[k]` for the k-th problem when given (a
+        filtered set), else its position.
+        
+        Returns:
+            Tuple of (results, total_passed, total_tests)
+        """
+        solving: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+
+        if indices is None:
+            indices = range(1, len(eval_set) + 1)
+
+        async def solve_one(i: int, item: PreparedProblem) -> Dict[str, Any]:
+            result = await self._solve_one(i, len(eval_set), item, enable_reflection,
+                                           max_retries, verbose, use_cache, solving)
+            if results_out is not None:
+                results_out.write(orjson.dumps(dict(result, index=indices[i - 1])) + b"\n")
+                results_out.flush()
+            return result
+
+        if max_workers <= 1:
+            results = [await solve_one(i, item) for i, item in enumerate(eval_set, 1)]
+        else:
+            semaphore = asyncio.Semaphore(max_workers)
+
+            async def run_one(i: int, item: PreparedProblem) -> Dict[str, Any]:
+                async with semaphore:
+                    return await solve_one(i, item)
+
+            results = await asyncio.gather(*(run_one(i, item) for i, item in enumerate(eval_set, 1)))
+
+        total_passed = sum(r["passed"] for r in results)
+        total_tests = sum(r["total"] for r in results)
+        return list(results), total_passed, total_tests
+    
+    async def _solve_one(self, i: int, n: int, item: PreparedProblem, enable_reflection: bool,
+                         max_retries: int, verbose: bool, use_cache: bool = True,
+                         solving: Optional[Dict[str, "asyncio.Future[Dict[str, Any]]"]] = None
+                         ) -> Dict[str, Any]:
+        """Solve problem `i` of `n` and return its result entry."""
+        problem, test_cases = item
+        n_tc = len(test_cases)
+        
+        try:
+            record = await self._solve(problem, test_cases, enable_reflection, max_retries,
+                                       use_cache, solving)
+            # "passed" is a bool, so summing them counts the passing cases
+            passed = sum(map(_passed, record["test_cases"]))
+            
+            result = {
+                "problem": problem,
+                "score": record["score"],
+                "passed": passed,
+                "total": n_tc,
+                "run_id": record["run_id"]
+            }
+            
+            status = f"  Score: {record['score']:.2%} ({passed}/{n_tc})"
+            
+        except Exception as e:
+            status = f"  Error: {e}"
+            result = {
+                "problem": problem,
+                "score": 0.0,
+                "passed": 0,
+                "total": n_tc,
+                "error": str(e)
+            }
+        
+        # One write once the problem finishes, so concurrent problems don't interleave
+        if verbose:
+            _write_out(f"Problem {i}/{n}: {problem[:60]}...\n{status}\n\n")
+        return result
+    
+    async def _solve(self, problem: str, test_cases: List[Tuple[List[Any], Any]],
+                     enable_reflection: bool, max_retries: int, use_cache: bool,
+                     solving: Optional[Dict[str, "asyncio.Future[Dict[str, Any]]"]]) -> Dict[str, Any]:
+        """
+        Solve one problem, sharing the solve between identical problems in a run.
+        
+        The agent's solution cache covers problems solved in earlier runs; it
+        only caches single-shot solves, so reflection runs are never shared.
+        """
+        def solve():
+            return self.agent.solve_problem(
+                problem, test_cases,
+                enable_reflection=enable_reflection,
+                max_retries=max_retries,
+                use_cache=use_cache
+            )
+
+        if not use_cache or enable_reflection or solving is None:
+            return await solve()
+
+        llm = self.agent.llm
+        key = solution_cache.make_key(problem, test_cases, llm.model, llm.temperature,
+                                      llm.max_tokens, llm.prompt_hash())
+        future = solving.get(key)
+        if future is None:
+            future = solving[key] = asyncio.ensure_future(solve())
+        return await future
+    
     def evaluate_subset(self, eval_set_path: str, start_idx: int, end_idx: int, 
                         **kwargs) -> Dict[str, Any]:
         """
@@ -156,35 +381,48 @@ class Evaluator:
         problem_filter = list(range(start_idx, end_idx))
         return self.evaluate(eval_set_path, problem_filter=problem_filter, **kwargs)
     
-    def compare_models(self, eval_set_path: str, models: List[str], 
+    def compare_models(self, eval_set_path: EvalSetSource, models: List[str], 
                       **kwargs) -> Dict[str, Any]:
         """
         Compare performance across different LLM models.
         
+        Models are evaluated concurrently, one thread (and event loop) each,
+        sharing this evaluator's code runner. The LLM class must be safe to
+        use from several threads; OpenAILLM keeps one HTTP client per loop.
+        
         Args:
-            eval_set_path: Path to evaluation dataset
+            eval_set_path: Path to evaluation dataset (or its loaded/prepared contents)
             models: List of model names to compare
             **kwargs: Additional arguments passed to evaluate()
             
         Returns:
             Dictionary with comparison results
         """
-        comparison_results = {}
-        
-        for model in models:
-            print(f"\nEvaluating with model: {model}")
+        if not models:
+            return {}
+        # Load and parse the eval set once for every model
+        eval_set = self._prepare_eval_set(eval_set_path)
+
+        def evaluate_model(model: str) -> Dict[str, Any]:
             custom_llm = self.agent.llm.__class__(model=model)
             custom_agent = CodeSolverAgent(llm=custom_llm, runner=self.agent.runner)
-            
-            evaluator = Evaluator(agent=custom_agent, output_file=f"runs/eval_{model}.json")
-            result = evaluator.evaluate(eval_set_path, verbose=False, **kwargs)
-            comparison_results[model] = result
-        
-        return comparison_results
+            evaluator = Evaluator(agent=custom_agent, output_file=os.path.join(EVAL_RUNS_DIR, f"eval_{model}.json"))
+            return evaluator.evaluate(eval_set, verbose=False, **kwargs)
+
+        finished = {}
+        with ThreadPoolExecutor(max_workers=len(models)) as pool:
+            futures = {pool.submit(evaluate_model, model): model for model in models}
+            for future in as_completed(futures):
+                model = futures[future]
+                finished[model] = future.result()
+                print(f"\nEvaluated model: {model} ({finished[model]['eval_score']:.2%})")
+
+        # Report in the order the models were given
+        return {model: finished[model] for model in models}
 
 
 # Backward compatibility function
-def evaluate(eval_set_path: str = "eval_set.json"):
+def evaluate(eval_set_path: str = EVAL_SET_PATH):
     """Backward compatibility function."""
     evaluator = Evaluator()
     result = evaluator.evaluate(eval_set_path)
@@ -192,5 +430,12 @@ def evaluate(eval_set_path: str = "eval_set.json"):
 
 
 if __name__ == "__main__":
-    score = evaluate()
-    sys.exit(0 if score >= 0.8 else 1)
+    parser = argparse.ArgumentParser(description="Evaluate the Code-Solver Agent on the eval set")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Solve every problem again instead of reusing cached results")
+    args = parser.parse_args()
+
+    result = Evaluator().evaluate(use_cache=not args.no_cache)
+    print(f"🏁 Final Eval Score = {result['eval_score']:.2f} "
+          f"({result['total_passed']}/{result['total_tests']})")
+    sys.exit(0 if result["eval_score"] >= 0.8 else 1)
@@ -0,0 +1,2 @@
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: runs the evaluate CLI end to end (needs an LLM API key)")
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from backend.app.core import agent as agent_module
+from backend.app.core import solution_cache
+from backend.app.core.agent import CodeSolverAgent
+from backend.app.core.llm import OpenAILLM
+from backend.app.core.runner import CodeRunner
+
+
+class ScriptedLLM(OpenAILLM):
+    """Returns the next scripted solution instead of calling the API."""
+
+    def __init__(self, solutions):
+        super().__init__(api_key="test")
+        self.solutions = list(solutions)
+        self.calls = 0
+
+    async def generate_code(self, problem_text, examples=None, temperature=None):
+        self.calls += 1
+        return self.solutions.pop(0)
+
+
+@pytest.fixture(autouse=True)
+def isolated_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(solution_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(agent_module, "save_run", lambda record: record)
+
+
+CASES = [([1, 2], 3), ([2, 2], 4)]
+WRONG = "def solve(a, b):\n    return 3\n"
+RIGHT = "def solve(a, b):\n    return a + b\n"
+
+
+def _solve(agent, **kwargs):
+    return asyncio.run(agent.solve_problem("Add two numbers", CASES, **kwargs))
+
+
+def test_failing_solutions_are_not_cached():
+    llm = ScriptedLLM([WRONG, RIGHT])
+    agent = CodeSolverAgent(llm=llm, runner=CodeRunner(use_worker_pool=False))
+    assert _solve(agent)["score"] == 0.5
+    assert _solve(agent)["score"] == 1.0
+    assert llm.calls == 2
+
+
+def test_passing_solutions_are_cached_unless_bypassed():
+    llm = ScriptedLLM([RIGHT, RIGHT])
+    agent = CodeSolverAgent(llm=llm, runner=CodeRunner(use_worker_pool=False))
+    first = _solve(agent)
+    assert _solve(agent) == first
+    assert llm.calls == 1
+    _solve(agent, use_cache=False)
+    assert llm.calls == 2
+
+
+class RacingLLM(ScriptedLLM):
+    """First attempt fails; during reflection the 0.7 candidate hangs, the other passes."""
+
+    def __init__(self):
+        super().__init__([WRONG])
+        self.slow_cancelled = False
+
+    async def generate_code(self, problem_text, examples=None, temperature=None):
+        if temperature is None:
+            return await super().generate_code(problem_text, examples)
+        if temperature < 0.7:
+            return RIGHT
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            self.slow_cancelled = True
+            raise
+        return RIGHT
+
+
+def test_reflection_waits_for_losing_candidates_to_cancel():
+    llm = RacingLLM()
+    agent = CodeSolverAgent(llm=llm, runner=CodeRunner(use_worker_pool=False))
+
+    async def solve():
+        record = await agent.solve_problem("Add two numbers", CASES, enable_reflection=True, max_retries=2)
+        # Checked before the loop gets another turn to process the cancellation
+        return record, llm.slow_cancelled
+
+    record, cancelled = asyncio.run(solve())
+    assert record["score"] == 1.0
+    assert cancelled
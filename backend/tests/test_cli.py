@@ -0,0 +1,25 @@
+import argparse
+
+import pytest
+
+from backend.app.cli import load_test_cases
+
+
+BIG = 2 ** 70
+CASES = f"[[[{BIG}], {BIG + 1}], [[1], 2]]"
+
+
+def test_long_integers_survive_inline_test_cases():
+    args = argparse.Namespace(test_cases=CASES, test_cases_file=None)
+    assert load_test_cases(args) == [[[BIG], BIG + 1], [[1], 2]]
+
+
+@pytest.mark.parametrize("text, expected", [
+    (CASES, [[[BIG], BIG + 1], [[1], 2]]),
+    ("[[[1], 2]]", [[[1], 2]]),
+])
+def test_long_integers_survive_test_cases_file(tmp_path, text, expected):
+    path = tmp_path / "cases.json"
+    path.write_text(text)
+    args = argparse.Namespace(test_cases=None, test_cases_file=str(path))
+    assert load_test_cases(args) == expected
@@ -1,12 +1,86 @@
-import subprocess, os
+import os
+import subprocess
 
-def test_eval_runs():
-    # run evaluate.py from backend/
+import orjson
+import pytest
+
+from backend.app.core.agent import CodeSolverAgent
+from backend.evaluate import Evaluator
+
+
+class StubLLM:
+    model = "stub"
+    temperature = 0.0
+    max_tokens = 100
+
+    def prompt_hash(self):
+        return "stub"
+
+
+class StubAgent:
+    """Deterministic stand-in for CodeSolverAgent: passes every case but the last."""
+
+    parse_test_cases = staticmethod(CodeSolverAgent.parse_test_cases)
+
+    def __init__(self):
+        self.llm = StubLLM()
+        self.solved = []
+
+    async def solve_problem(self, problem, test_cases, enable_reflection=False,
+                            max_retries=1, use_cache=True):
+        self.solved.append(problem)
+        if "palindrome" in problem:
+            raise RuntimeError("stub failure")
+        cases = [{"passed": i < len(test_cases) - 1} for i in range(len(test_cases))]
+        passed = sum(c["passed"] for c in cases)
+        return {"run_id": str(len(self.solved)), "score": passed / len(cases), "test_cases": cases}
+
+
+def test_eval_runs(tmp_path):
+    eval_set = [
+        {"problem": "Return the sum of two numbers", "test_cases": [[[1, 2], 3], [[2, 2], 4]]},
+        {"problem": "Check if a string is a palindrome", "test_cases": [[["aa"], True]]},
+        {"problem": "Return the sum of two numbers", "test_cases": [[[1, 2], 3], [[2, 2], 4]]},
+    ]
+    agent = StubAgent()
+    output_file = str(tmp_path / "eval_history.json")
+    result = Evaluator(agent=agent, output_file=output_file).evaluate(eval_set, verbose=False)
+
+    assert [r["passed"] for r in result["results"]] == [1, 0, 1]
+    assert result["results"][1]["error"] == "stub failure"
+    assert (result["total_passed"], result["total_tests"]) == (2, 5)
+    assert result["eval_score"] == pytest.approx(0.4)
+    # Identical single-shot problems are solved once per run
+    assert len(agent.solved) == 2
+
+    with open(output_file, "rb") as f:
+        summary = orjson.loads(f.read())
+    assert summary["eval_score"] == result["eval_score"]
+    with open(tmp_path / "eval_history.jsonl", "rb") as f:
+        lines = [orjson.loads(line) for line in f]
+    assert sorted(line["index"] for line in lines) == [1, 2, 3]
+
+
+def test_filtered_eval_keeps_eval_set_indices(tmp_path):
+    eval_set = [{"problem": f"Return {i}", "test_cases": [[[i], i]]} for i in range(5)]
+    output_file = str(tmp_path / "eval_history.json")
+    Evaluator(agent=StubAgent(), output_file=output_file).evaluate(
+        eval_set, problem_filter=[3, 1], verbose=False
+    )
+    with open(tmp_path / "eval_history.jsonl", "rb") as f:
+        lines = [orjson.loads(line) for line in f]
+    assert sorted((line["index"], line["problem"]) for line in lines) == [(2, "Return 1"), (4, "Return 3")]
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(not os.environ.get("OPENAI_API_KEY"), reason="needs an OpenAI API key")
+def test_eval_cli():
+    # run backend.evaluate as a module from the repository root
     here = os.path.dirname(__file__)
-    backend_dir = os.path.abspath(os.path.join(here, ".."))
+    repo_dir = os.path.abspath(os.path.join(here, "..", ".."))
     result = subprocess.run(
-        ["python", "evaluate.py"],
-        cwd=backend_dir,
+        ["python", "-m", "backend.evaluate"],
+        cwd=repo_dir,
         capture_output=True,
         text=True
     )
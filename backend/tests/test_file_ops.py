@@ -0,0 +1,84 @@
+import importlib.util
+import os
+
+import pytest
+
+FILE_OPS_PATH = os.path.join(os.path.dirname(__file__), "..", "app", "utils", "file_ops.py")
+
+
+def _load_file_ops(runs_dir, name):
+    """A separate copy of file_ops writing to `runs_dir`; each copy stands in for one process."""
+    spec = importlib.util.spec_from_file_location(name, FILE_OPS_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.RUNS_DIR = str(runs_dir)
+    module.RUNS_LOG_PATH = os.path.join(module.RUNS_DIR, "runs.jsonl")
+    module.INDEX_PATH = os.path.join(module.RUNS_DIR, "_index.jsonl")
+    module.LOCK_PATH = os.path.join(module.RUNS_DIR, ".runs.lock")
+    return module
+
+
+@pytest.fixture
+def stores(tmp_path):
+    return [_load_file_ops(tmp_path, f"file_ops_under_test_{i}") for i in range(2)]
+
+
+def _record(run_id, problem="Add two numbers", score=1.0):
+    return {"run_id": run_id, "timestamp": "t", "problem_text": problem, "score": score,
+            "test_cases": [{"passed": True}]}
+
+
+def test_runs_saved_by_another_process_are_found(stores):
+    server, cli = stores
+    server.save_run(_record("1"))
+    server.run_writer.drain()
+    assert server.load_run("1")["run_id"] == "1"
+
+    # Saved after the server has already read the index
+    cli.save_run(_record("2", problem="Reverse a string"))
+    cli.run_writer.drain()
+    assert server.load_run("2")["problem_text"] == "Reverse a string"
+
+    # Interleaved appends from both keep correct offsets
+    for i in range(3, 9):
+        store = stores[i % 2]
+        store.save_run(_record(str(i)))
+        store.run_writer.drain()
+    assert [server.load_run(str(i))["run_id"] for i in range(1, 9)] == [str(i) for i in range(1, 9)]
+
+
+def test_run_listing_picks_up_runs_from_another_process(stores):
+    server, cli = stores
+    server.save_run(_record("1"))
+    server.run_writer.drain()
+    assert [s["run_id"] for s in server.list_run_summaries(10)] == ["1"]
+
+    cli.save_run(_record("2"))
+    cli.run_writer.drain()
+    assert [s["run_id"] for s in server.list_run_summaries(10)] == ["2", "1"]
+    assert server.list_runs() == ["run_2.json", "run_1.json"]
+
+
+def test_saved_run_round_trips(stores, tmp_path):
+    record = _record("1", problem="x" * 200, score=0.5)
+    record["solution_code"] = "def solve(n):\n    return n\n"
+    writer, _ = stores
+    writer.save_run(record)
+    writer.run_writer.drain()
+
+    # A fresh copy has nothing cached, so both reads come from disk
+    reader = _load_file_ops(tmp_path, "file_ops_under_test_reader")
+    assert reader.load_run("1") == record
+    [summary] = reader.list_run_summaries(10)
+    assert summary == {"run_id": "1", "timestamp": "t", "score": 0.5,
+                       "problem_preview": "x" * reader.PREVIEW_CHARS + "..."}
+
+
+def test_rescan_and_writer_agree_on_a_reused_id(stores, tmp_path):
+    writer, _ = stores
+    for score in (0.0, 1.0):
+        writer.save_run(_record("1", score=score))
+        writer.run_writer.drain()
+    assert writer.load_run("1")["score"] == 1.0
+    reader = _load_file_ops(tmp_path, "file_ops_under_test_rescan")
+    assert reader.load_run("1")["score"] == 1.0
@@ -0,0 +1,29 @@
+import json
+import math
+
+import pytest
+
+from backend.app.utils.json_io import load_json_file, loads_json
+
+BIG = 2 ** 70
+
+
+@pytest.mark.parametrize("data", [f"[{BIG}, 1]", f"[{BIG}, 1]".encode(), memoryview(f"[{BIG}, 1]".encode())])
+def test_long_integers_stay_exact(data):
+    assert loads_json(data) == [BIG, 1]
+
+
+def test_non_standard_constants_fall_back_to_json():
+    value = loads_json(b'{"a": NaN, "b": Infinity}')
+    assert math.isnan(value["a"]) and value["b"] == math.inf
+
+
+def test_invalid_json_raises_json_error():
+    with pytest.raises(json.JSONDecodeError):
+        loads_json(b"[1,")
+
+
+def test_load_json_file(tmp_path):
+    path = tmp_path / "set.json"
+    path.write_text(f'[{{"n": {BIG}}}]')
+    assert load_json_file(str(path)) == [{"n": BIG}]
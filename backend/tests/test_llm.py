@@ -0,0 +1,25 @@
+import pytest
+
+from backend.app.core.llm import OpenAILLM
+
+
+@pytest.mark.parametrize("first, second", [
+    (1, True),
+    (1, 1.0),
+    (0.0, -0.0),
+    ({"a": 1}, [["a", 1]]),
+])
+def test_prompt_examples_keep_their_own_rendering(first, second):
+    llm = OpenAILLM(api_key="test")
+    for expected in (first, second):
+        user = llm.build_messages("p", [{"inputs": [expected], "expected": expected}])[1]["content"]
+        assert f"- inputs={[expected]}, expected={expected}\n" in user
+
+
+def test_prompt_template_changes_the_prompt_hash(tmp_path):
+    first, second = tmp_path / "first.txt", tmp_path / "second.txt"
+    first.write_text("Write solve().")
+    second.write_text("Write solve() carefully.")
+    hashes = [OpenAILLM(api_key="test", prompt_template_path=str(p)).prompt_hash()
+              for p in (first, first, second)]
+    assert hashes[0] == hashes[1] != hashes[2]
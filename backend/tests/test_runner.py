@@ -0,0 +1,214 @@
+import asyncio
+import os
+import signal
+
+import pytest
+
+from backend.app.core.runner import CodeRunner, _WorkerPool
+
+
+ESCAPES = [
+    # object.__getattribute__ with built-up names reaches __import__
+    'def solve(x):\n'
+    '    ga = object.__getattribute__\n'
+    '    b = ga(solve, "__glo" + "bals__")["__buil" + "tins__"]\n'
+    '    return ga(b, "__imp" + "ort__")("o" + "s").getcwd()\n',
+    "def solve(x):\n    return x.__class__.__base__\n",
+    "def solve(x):\n    return solve.__dict__\n",
+    "def solve(x):\n    return solve.__init__\n",
+    # Private module members hold other modules
+    "import random\ndef solve(x):\n    return random._os.getcwd()\n",
+    "import random as r\ndef solve(x):\n    return r._os.getcwd()\n",
+    "def solve(x):\n    return random._os.getcwd()\nimport random\n",
+    "from random import _os\ndef solve(x):\n    return _os.getcwd()\n",
+    "import os\ndef solve(x):\n    return os.getcwd()\n",
+    "def solve(x):\n    f = getattr\n    return f(x, 'real')\n",
+    # Blocked builtins reached as attributes
+    "def solve(x):\n    return len.__self__.__import__('os').getcwd()\n",
+    "def solve(x):\n    b = len.__self__\n    return b.open('/etc/passwd').read()\n",
+    "def solve(x):\n    return x.eval('1')\n",
+    "def solve(x):\n    return x.exec('1')\n",
+    # Frame walks reach other modules' globals
+    "def solve(x):\n"
+    "    gen = (i for i in [1])\n"
+    "    return gen.gi_frame.f_back.f_globals['os'].getcwd()\n",
+    "def solve(x):\n"
+    "    try:\n"
+    "        1 / 0\n"
+    "    except Exception as e:\n"
+    "        return e.__traceback__.tb_frame.f_globals\n",
+    "def solve(x):\n    return x.f_builtins\n",
+    # The harness's own modules are not globals of the solution
+    "def solve(x):\n    return __loader__.get_data('/etc/passwd')\n",
+]
+
+ALLOWED = [
+    'import re\ndef solve(s):\n    return re.compile("a").sub("b", s)\n',
+    "from collections.abc import Iterable\ndef solve(x):\n    return isinstance(x, Iterable)\n",
+    # Blocked names inside strings and comments are just text
+    'def solve(x):\n    # getattr(x, "y")\n    return "open(" + str(x)\n',
+    # Private attributes of the solution's own objects are fine
+    "def solve(x):\n    class Box:\n        _v = 1\n    return Box()._v + x\n",
+]
+
+
+@pytest.mark.parametrize("code", ESCAPES)
+def test_sandbox_escapes_are_blocked(code):
+    with pytest.raises(RuntimeError):
+        CodeRunner()._validate_code_safety(code)
+
+
+@pytest.mark.parametrize("code", ALLOWED)
+def test_ordinary_code_is_allowed(code):
+    CodeRunner()._validate_code_safety(code)
+
+
+def test_cancelled_run_kills_its_batch(monkeypatch):
+    runner = CodeRunner(use_worker_pool=False)
+    killed = []
+    kill_group = CodeRunner._kill_group
+
+    def record_kill(pid):
+        killed.append(pid)
+        kill_group(pid)
+
+    monkeypatch.setattr(CodeRunner, "_kill_group", staticmethod(record_kill))
+    code = "import time\ndef solve(x):\n    time.sleep(30)\n"
+
+    async def cancel_mid_run():
+        task = asyncio.create_task(runner.run_tests_async("sleep", code, [([1], None)], timeout=30))
+        await asyncio.sleep(1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_mid_run())
+    assert len(killed) == 1
+    with pytest.raises(ProcessLookupError):
+        os.killpg(killed[0], 0)
+
+
+def _run(code, test_cases, timeout=None):
+    return CodeRunner(use_worker_pool=False).run_tests("p", code, test_cases, timeout=timeout)
+
+
+def test_cases_are_scored_pass_and_fail():
+    record = _run("def solve(a, b):\n    return a + b\n", [([1, 2], 3), ([2, 2], 5), ([0, 0], 0)])
+    assert [case["passed"] for case in record["test_cases"]] == [True, False, True]
+    assert record["score"] == pytest.approx(2 / 3)
+    assert record["test_cases"][1]["output"] == "4"
+
+
+def test_timeout_fails_only_its_own_case():
+    code = ("import time\n"
+            "def solve(x):\n"
+            "    if x < 0:\n"
+            "        time.sleep(30)\n"
+            "    return x\n")
+    record = _run(code, [([1], 1), ([-1], -1), ([2], 2)], timeout=1)
+    cases = record["test_cases"]
+    assert [case["passed"] for case in cases] == [True, False, True]
+    assert "Timeout" in cases[1]["error"]
+
+
+@pytest.mark.parametrize("code", [
+    "def solve(a, b):\n    return [a, b]\n",
+    "def solve(pair):\n    return list(pair)\n",
+])
+def test_solve_takes_args_spread_or_whole(code):
+    assert _run(code, [([1, 2], [1, 2])])["score"] == 1.0
+
+
+def test_printing_solution_still_scores():
+    code = "def solve(x):\n    print('debug', x)\n    return x * 2\n"
+    record = _run(code, [([1], 2), ([3], 6)])
+    assert [case["passed"] for case in record["test_cases"]] == [True, True]
+
+
+def test_harness_modules_are_not_solution_globals():
+    # Passes validation (no import, no blocked name) but `sys` must not resolve
+    code = "def solve(x):\n    return sys.modules['os'].getcwd()\n"
+    record = CodeRunner(use_worker_pool=False).run_tests("p", code, [([1], None)])
+    assert record["test_cases"][0]["error"] == "name 'sys' is not defined"
+
+
+@pytest.fixture
+def pool_runner():
+    """A runner on its own one-worker pool, so every case reuses the same worker."""
+    runner = CodeRunner(use_worker_pool=False)
+    runner._pool = _WorkerPool(max_workers=1)
+    yield runner
+    runner.close()
+
+
+def test_pool_solution_cannot_change_later_solutions(pool_runner):
+    patcher = ("import json\n"
+               "json.dumps = lambda *a, **k: 'pwned'\n"
+               "print('top-level output')\n"
+               "def solve(x):\n"
+               "    return x\n")
+    assert pool_runner.run_tests("p", patcher, [([1], 1)])["score"] == 1.0
+    user = "import json\ndef solve(x):\n    return json.dumps(x)\n"
+    assert pool_runner.run_tests("p", user, [([1], "1")])["score"] == 1.0
+
+
+def test_pool_scores_pass_and_fail(pool_runner):
+    record = pool_runner.run_tests("p", "def solve(a, b):\n    return a + b\n",
+                                   [([1, 2], 3), ([2, 2], 5), ([0, 0], 0)])
+    assert [case["passed"] for case in record["test_cases"]] == [True, False, True]
+
+
+def test_pool_timeout_fails_only_its_own_case(pool_runner):
+    code = "def solve(x):\n    while x < 0:\n        pass\n    return x\n"
+    cases = pool_runner.run_tests("p", code, [([1], 1), ([-1], -1), ([2], 2)], timeout=1)["test_cases"]
+    assert [case["passed"] for case in cases] == [True, False, True]
+    assert cases[1]["error"] == "Timeout after 1s"
+
+
+def test_pool_survives_top_level_infinite_loop(pool_runner):
+    code = "while True:\n    pass\ndef solve(x):\n    return x\n"
+    cases = pool_runner.run_tests("p", code, [([1], 1)], timeout=1)["test_cases"]
+    assert cases[0]["error"] == "Timeout after 1s"
+    assert pool_runner.run_tests("p", "def solve(x):\n    return x\n", [([1], 1)])["score"] == 1.0
+
+
+def test_pool_replaces_a_stuck_worker(pool_runner):
+    pool = pool_runner._pool
+    pool.warm_up()
+    [stuck] = pool._workers
+    # A worker that stops answering misses the case deadline and is killed
+    os.kill(stuck.process.pid, signal.SIGSTOP)
+    cases = pool_runner.run_tests("p", "def solve(x):\n    return x\n", [([1], 1)], timeout=1)["test_cases"]
+    assert cases[0]["error"] == "Timeout after 1s"
+    assert not stuck.process.is_alive()
+    [replacement] = pool._workers
+    assert replacement is not stuck
+    assert pool_runner.run_tests("p", "def solve(x):\n    return x\n", [([1], 1)])["score"] == 1.0
+
+
+def test_pool_restarts_after_close(pool_runner):
+    code = "def solve(x):\n    return x * 2\n"
+    assert pool_runner.run_tests("p", code, [([1], 2)])["score"] == 1.0
+    pool_runner.close()
+    assert not pool_runner._pool._workers
+    assert pool_runner.run_tests("p", code, [([2], 4), ([3], 6)])["score"] == 1.0
+
+
+@pytest.mark.parametrize("code", [
+    "def solve(x):\n    if x < 0:\n        exit(0)\n    return x\n",
+    "def solve(x):\n    if x < 0:\n        raise SystemExit(1)\n    return x\n",
+])
+def test_exiting_case_fails_only_itself(code):
+    cases = _run(code, [([1], 1), ([-1], -1), ([2], 2)])["test_cases"]
+    assert [case["passed"] for case in cases] == [True, False, True]
+
+
+def test_output_without_trailing_newline_still_scores():
+    code = "def solve(x):\n    print('dbg', end='')\n    return x\n"
+    assert _run(code, [([1], 1), ([2], 2)])["score"] == 1.0
+
+
+def test_runs_finishing_together_get_distinct_ids():
+    runner = CodeRunner(use_worker_pool=False)
+    ids = {runner._blocked_record("p", "import os", "blocked")["run_id"] for _ in range(100)}
+    assert len(ids) == 100